@@ -0,0 +1,103 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Report where the import time of a Brain module goes.
+
+Usage: python benchmarks/import_time.py [MODULE] [--runs 5] [--top 15]
+           [--budget-ms MS] [--json]
+
+MODULE, brain.main by default, is imported ``--runs`` times with
+``python -X importtime`` in fresh interpreters, and the fastest run is
+reported: total time, time per package and the slowest modules by their
+own time. With ``--budget-ms``, the exit status is 1 when the total goes
+over the budget, so that a startup regression fails the build.
+"""
+
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> list:
+    """Import ``module`` in a new interpreter, return (module, self_us, cumulative_us)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}:\n{result.stderr}")
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def package(name: str) -> str:
+    """Group the modules of Brain by subpackage, the others by distribution."""
+    parts = name.split(".")
+    if parts[0] == "brain" and len(parts) > 2:
+        return ".".join(parts[:3])
+    return ".".join(parts[:2]) if parts[0] == "brain" else parts[0]
+
+
+def report(module: str, imports: list, top: int) -> dict:
+    total_us = next(cumulative for name, _, cumulative in reversed(imports) if name == module)
+    packages = collections.Counter()
+    for name, self_us, _ in imports:
+        packages[package(name)] += self_us
+    slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(imports),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in packages.most_common(top)},
+        "slowest_ms": {name: round(self_us / 1000, 1) for name, self_us, _ in slowest},
+    }
+
+
+def print_report(r: dict) -> None:
+    print(f"{r['module']}: {r['total_ms']} ms, {r['modules']} modules")
+    print("\nby package (own time):")
+    for name, ms in r["packages_ms"].items():
+        print(f"  {ms:>9.1f} ms  {name}")
+    print("\nslowest modules (own time):")
+    for name, ms in r["slowest_ms"].items():
+        print(f"  {ms:>9.1f} ms  {name}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="brain.main")
+    parser.add_argument("--runs", type=int, default=5, help="imports to keep the fastest of")
+    parser.add_argument("--top", type=int, default=15, help="packages and modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail when the import takes longer")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    runs = [report(args.module, measure(args.module), args.top) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["total_ms"])
+    best["runs_ms"] = [r["total_ms"] for r in runs]
+    if args.budget_ms is not None:
+        best["budget_ms"] = args.budget_ms
+
+    if args.json:
+        print(json.dumps(best))
+    else:
+        print_report(best)
+    if args.budget_ms is not None and best["total_ms"] > args.budget_ms:
+        print(f"\n{args.module} takes {best['total_ms']} ms to import, over the budget of "
+              f"{args.budget_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Measure JSONDocumentDB operation latency and throughput.
+
+Usage: python benchmarks/json_db.py [--sizes 100,1000,10000,100000]
+           [--threads 1,4,16] [--engines json,sqlite] [--windows 0,0.002]
+           [--ops find,scan,find_one,insert,update,delete] [--json]
+
+Every combination of storage engine, group commit window (how long a flush
+waits for the other writers to queue their entries: with 0 it does not, yet
+entries queued while a flush runs still share the next one) and collection
+size gets a fresh database in a temporary directory, preloaded with
+documents shaped like the system disks. Each operation then runs from every thread count until
+``--operations`` calls or ``--duration`` seconds, whichever comes first.
+Read operations do not depend on the window and only run with the first.
+
+find filters on an indexed field, scan on a field without index,
+find_one, update and delete go by primary key. delete removes documents
+added for it before each run, outside of the measurement.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# The brain package and the test helpers of this checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brain import json_db  # noqa: E402
+from snapshot_formats import make_documents  # noqa: E402
+from tests.utils import open_db as open_test_db  # noqa: E402
+
+COLLECTION = "system_disks"
+READ_OPS = ("find", "scan", "find_one")
+WRITE_OPS = ("insert", "update", "delete")
+
+
+def open_db(path: str, engine: str, window: float) -> json_db.JSONDocumentDB:
+    db = open_test_db(path, engine)
+    db.GROUP_COMMIT_WINDOW = window
+    return db
+
+
+class Workload:
+    """Operations against a preloaded collection, safe to call from threads."""
+
+    def __init__(self, db: json_db.JSONDocumentDB, documents: list) -> None:
+        self.db = db
+        self.ids = [doc["id"] for doc in documents]
+        self.ips = sorted({doc["mv200_ip"] for doc in documents})
+        self.sizes = sorted({doc["size_gb"] for doc in documents})
+        # Documents added for deletion only, so that the other operations
+        # keep finding the preloaded ones
+        self.doomed = []
+        self.lock = threading.Lock()
+
+    def prepare_delete(self, count: int) -> None:
+        documents = make_documents(count)[COLLECTION]
+        self.db.insert_many(COLLECTION, documents)
+        self.doomed = [doc["id"] for doc in documents]
+
+    def find(self) -> None:
+        self.db.find(COLLECTION, {"mv200_ip": random.choice(self.ips)})
+
+    def scan(self) -> None:
+        self.db.find(COLLECTION, {"size_gb": random.choice(self.sizes)}, limit=10)
+
+    def find_one(self) -> None:
+        self.db.find_one(COLLECTION, {"id": random.choice(self.ids)})
+
+    def insert(self) -> None:
+        doc = make_documents(1)[COLLECTION][0]
+        doc["id"] = str(uuid.uuid4())
+        self.db.insert(COLLECTION, doc)
+
+    def update(self) -> None:
+        self.db.update_one(COLLECTION, {"id": random.choice(self.ids)},
+                           {"description": "updated"})
+
+    def delete(self) -> None:
+        with self.lock:
+            key = self.doomed.pop()
+        self.db.delete_one(COLLECTION, {"id": key})
+
+
+def run(call, threads: int, operations: int, duration: float) -> dict:
+    """Call ``call`` from ``threads`` threads and summarize the latencies."""
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+    latencies = [[] for _ in range(threads)]
+
+    def worker(samples: list) -> None:
+        while next(counter) < operations and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(samples,)) for samples in latencies]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = sorted(itertools.chain.from_iterable(latencies))
+    if not samples:
+        return {"operations": 0}
+
+    def percentile(p: float) -> float:
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1e6, 1)
+    return {
+        "operations": len(samples),
+        "ops_per_s": round(len(samples) / elapsed, 1),
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 1),
+        "p50_us": percentile(0.5),
+        "p99_us": percentile(0.99),
+        "max_us": round(samples[-1] * 1e6, 1),
+    }
+
+
+def bench(engine: str, window: float, size: int, args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = open_db(tmp, engine, window)
+        db.create_index(COLLECTION, "mv200_ip")
+        documents = make_documents(size)[COLLECTION]
+        start = time.perf_counter()
+        db.insert_many(COLLECTION, documents)
+        load_s = time.perf_counter() - start
+        workload = Workload(db, documents)
+        for op in args.ops:
+            if op in READ_OPS and window != args.windows[0]:
+                continue
+            for threads in args.threads:
+                if op == "delete":
+                    workload.prepare_delete(args.operations)
+                stats = run(getattr(workload, op), threads, args.operations, args.duration)
+                results.append({"engine": engine, "window": window, "documents": size,
+                                "op": op, "threads": threads, "preload_s": round(load_s, 3),
+                                **stats})
+                if not args.json:
+                    print_result(results[-1])
+        # Let a background compaction finish before the directory goes away
+        while any(shard._compacting for shard in db._shards.values()):
+            time.sleep(0.01)
+        db.clear_cache()
+    return results
+
+
+def print_result(r: dict) -> None:
+    if not r["operations"]:
+        print(f"{r['engine']:<8}{r['window']:>8}{r['documents']:>9}{r['op']:>10}"
+              f"{r['threads']:>8}  no operation completed")
+        return
+    print(f"{r['engine']:<8}{r['window']:>8}{r['documents']:>9}{r['op']:>10}"
+          f"{r['threads']:>8}{r['ops_per_s']:>12.1f}{r['p50_us']:>12.1f}{r['p99_us']:>12.1f}")
+
+
+def _list(kind):
+    return lambda value: [kind(item) for item in value.split(",") if item]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_list(int), default=[100, 1000, 10000, 100000],
+                        help="comma separated collection sizes")
+    parser.add_argument("--threads", type=_list(int), default=[1, 4, 16],
+                        help="comma separated thread counts")
+    parser.add_argument("--engines", type=_list(str), default=["json", "sqlite"],
+                        help="comma separated storage engines")
+    parser.add_argument("--windows", type=_list(float),
+                        default=[0, json_db.JSONDocumentDB.GROUP_COMMIT_WINDOW],
+                        help="comma separated group commit windows in seconds")
+    parser.add_argument("--ops", type=_list(str), default=list(READ_OPS + WRITE_OPS),
+                        help="comma separated operations")
+    parser.add_argument("--operations", type=int, default=2000,
+                        help="calls per operation and thread count")
+    parser.add_argument("--duration", type=float, default=2.0,
+                        help="seconds per operation and thread count at most")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.ops) - set(READ_OPS + WRITE_OPS)
+    if unknown:
+        parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+    unknown = set(args.engines) - set(json_db.DB_SUFFIXES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    if not args.json:
+        print(f"{'engine':<8}{'window':>8}{'docs':>9}{'op':>10}{'threads':>8}"
+              f"{'ops/s':>12}{'p50 (us)':>12}{'p99 (us)':>12}")
+    results = []
+    for engine, window, size in itertools.product(args.engines, args.windows, args.sizes):
+        results.extend(bench(engine, window, size, args))
+
+    if args.json:
+        print(json.dumps({"operations": args.operations, "duration": args.duration,
+                          "results": results}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Compare the JSONDocumentDB snapshot formats.
+
+Usage: python benchmarks/snapshot_formats.py [--documents 50000] [--json]
+
+For every available format, measures the time to save (encode, write and
+fsync) and to load (read and decode) a snapshot, and its size.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from brain.storage.json_file import FORMATS, decode_snapshot, encode_snapshot, msgpack
+
+
+def make_documents(count: int) -> dict:
+    """Documents shaped like the system disks the service stores."""
+    disks = []
+    for i in range(count):
+        disk_id = str(uuid.uuid4())
+        disks.append({
+            "id": disk_id,
+            "image_id": str(uuid.uuid4()),
+            "mv200_id": str(uuid.uuid4()),
+            "mv200_ip": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            "size_gb": 20 + i % 500,
+            "mon_host": "192.168.10.11",
+            "flatten": bool(i % 2),
+            "rbd_path": f"compute/{disk_id}",
+            "blk_id": i,
+            "description": f"system disk {i}",
+            "creator": "admin",
+            "_rev": i + 1,
+        })
+    return {"system_disks": disks, "__meta__": {"seq": count}}
+
+
+def measure(data: dict, fmt: str, path: str, repeat: int) -> dict:
+    save = load = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        raw = encode_snapshot(data, fmt)
+        with open(path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        save = min(save, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            decode_snapshot(f.read())
+        load = min(load, time.perf_counter() - start)
+    return {"format": fmt, "save_s": round(save, 4), "load_s": round(load, 4),
+            "bytes": os.path.getsize(path)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    data = make_documents(args.documents)
+    formats = [fmt for fmt in FORMATS if fmt != "msgpack" or msgpack is not None]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [measure(data, fmt, os.path.join(tmp, f"snapshot.{fmt}"), args.repeat)
+                   for fmt in formats]
+
+    if args.json:
+        print(json.dumps({"documents": args.documents, "results": results}))
+        return 0
+    print(f"{args.documents} documents")
+    print(f"{'format':<10}{'save (s)':>10}{'load (s)':>10}{'size (MiB)':>12}")
+    for r in results:
+        print(f"{r['format']:<10}{r['save_s']:>10.4f}{r['load_s']:>10.4f}"
+              f"{r['bytes'] / 1048576:>12.2f}")
+    if msgpack is None:
+        print("msgpack is not installed, its format was skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import datetime
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from brain import backup
+from brain.api.schemas import backup_schemas
+from brain.auth import authenticate_user
+from brain.json_db import AsyncJSONDocumentDB
+
+router = APIRouter(dependencies=[Depends(authenticate_user)])
+LOG = logging.getLogger(__name__)
+db = AsyncJSONDocumentDB()
+
+
+@router.get("/backup")
+async def create_backup(
+    compress: bool = Query(False, description="Gzip the backup"),
+    collection: Optional[List[str]] = Query(None, description="Collections to back up, "
+                                                              "all by default")
+):
+    """Stream a point-in-time backup of the database"""
+    known = db.collections()
+    unknown = [name for name in collection or () if name not in known]
+    if unknown:
+        LOG.warning(f"Cannot back up unknown collections {unknown}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Unknown collections: {', '.join(unknown)}")
+
+    exported = await db.export(collection)
+    LOG.info(f"Streaming a backup of {len(exported)} collections, compress={compress}")
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    filename = f"brain-backup-{timestamp}.jsonl" + (".gz" if compress else "")
+    return StreamingResponse(
+        backup.stream(exported, compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/backup/restore", response_model=backup_schemas.RestoreResult)
+async def restore_backup(file: UploadFile = File(...)):
+    """Replace the collections of a backup with its content"""
+    LOG.info(f"Restoring backup {file.filename}")
+    try:
+        data = await run_in_threadpool(backup.read, file.file)
+    except ValueError as e:
+        LOG.warning(f"Rejected backup {file.filename}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    result = {}
+    for name, docs in data.items():
+        try:
+            rev = await db.restore(name, docs)
+        except ValueError as e:
+            LOG.error(f"Failed to restore collection {name}: {e}")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result[name] = {"documents": len(docs), "rev": rev}
+        LOG.info(f"Restored {len(docs)} documents of {name} at revision {rev}")
+    return {"collections": result}
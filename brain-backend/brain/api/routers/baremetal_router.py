@@ -8,20 +8,24 @@ from typing import List
 import logging
 import uuid
 
-from brain.json_db import JSONDocumentDB
+from brain.json_db import AsyncJSONDocumentDB
 from brain.auth import authenticate_user
 from brain.api.schemas import bare_metal_schemas
 from brain.utils.ssh_client import ssh_execute
 
 router = APIRouter(dependencies=[Depends(authenticate_user)])
 LOG = logging.getLogger(__name__)
-db = JSONDocumentDB()
+db = AsyncJSONDocumentDB()
 
 # Collection name
 BARE_METAL_SERVER_COLLECTION = "bare_metals"
 BMC_USER = "ipmiadmin"
 BMC_PASS = "ymxl@2022"
 
+# Secondary indexes
+db.create_index(BARE_METAL_SERVER_COLLECTION, "name")
+db.create_index(BARE_METAL_SERVER_COLLECTION, "host_ip")
+
 
 def get_bmc_ip(host_ip: str) -> str:
     """Convert host_ip like 10.0.3.x to BMC ip 10.0.2.x"""
@@ -93,7 +97,7 @@ async def create_bare_metal_server(server_data: bare_metal_schemas.BareMetalServ
 
     LOG.info(f"Creating bare metal server {server_id} with name {server_data.name}")
     # Insert new server
-    db.insert(BARE_METAL_SERVER_COLLECTION, server_dict)
+    await db.insert(BARE_METAL_SERVER_COLLECTION, server_dict)
     LOG.info(f"Successfully created bare metal server {server_id}")
 
     # Return the created server information
@@ -180,7 +184,8 @@ async def update_bare_metal_server(
         exclude_unset=True).items() if v is not None}
     if update_dict:
         LOG.info(f"Updating server {server_id} with fields: {list(update_dict.keys())}")
-        updated_count = db.update(BARE_METAL_SERVER_COLLECTION, {"id": server_id}, update_dict)
+        updated_count = await db.update(BARE_METAL_SERVER_COLLECTION, {"id": server_id},
+                                        update_dict)
         if updated_count == 0:
             LOG.error(f"Failed to update server {server_id} in database")
             raise HTTPException(
@@ -216,7 +221,7 @@ async def delete_bare_metal_server(server_id: str):
     server_name = existing_servers[0].get("name", "unknown")
     LOG.info(f"Deleting bare metal server {server_id} ({server_name})")
     # Delete server
-    deleted_count = db.delete(BARE_METAL_SERVER_COLLECTION, {"id": server_id})
+    deleted_count = await db.delete(BARE_METAL_SERVER_COLLECTION, {"id": server_id})
     if deleted_count == 0:
         LOG.error(f"Failed to delete server {server_id} from database")
         raise HTTPException(
@@ -497,7 +502,7 @@ async def update_server_credentials(
         "os_password": credentials.pwd
     }
 
-    db.update_one(BARE_METAL_SERVER_COLLECTION, {"id": server_id}, update_data)
+    await db.update_one(BARE_METAL_SERVER_COLLECTION, {"id": server_id}, update_data)
 
     LOG.info(f"Successfully updated OS credentials for server {server_id}")
     return {"message": "OS credentials updated successfully"}
\ No newline at end of file
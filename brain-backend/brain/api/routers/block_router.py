@@ -2,8 +2,8 @@
 # All rights reserved.
 
 import re
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 import logging
 import uuid
 from urllib.parse import quote
@@ -11,7 +11,7 @@ from urllib.parse import quote
 from brain.api.schemas import block_schemas
 from brain.auth import authenticate_user
 from brain import exceptions
-from brain.json_db import JSONDocumentDB
+from brain.json_db import AsyncJSONDocumentDB, ConflictError, REVISION_KEY
 from brain.utils import get_cephclient, get_dpuagentclient, ssh_execute
 from brain.clients.ceph import api as ceph_api
 from brain.clients.dpuagent import api as dpuagent_api
@@ -19,7 +19,7 @@ from brain.clients.ceph.exceptions import ApiException
 
 router = APIRouter(dependencies=[Depends(authenticate_user)])
 LOG = logging.getLogger(__name__)
-db = JSONDocumentDB()
+db = AsyncJSONDocumentDB()
 
 # Collection names
 SYSTEM_DISK_COLLECTION = "system_disks"
@@ -32,6 +32,18 @@ RBD_POOL = "compute"
 IMAGE_POOL = "images"
 SNAP_NAME = "brain_snap"
 
+# Secondary indexes
+db.create_index(SYSTEM_DISK_COLLECTION, "rbd_path")
+db.create_index(SYSTEM_DISK_COLLECTION, "mv200_ip")
+db.create_index(SYSTEM_DISK_COLLECTION, "mv200_id")
+db.create_index(SYSTEM_DISK_COLLECTION, "image_id")
+db.create_index(IMAGE_COLLECTION, "name")
+db.create_index(IMAGE_COLLECTION, "ceph_location")
+
+# View kept up to date on every write, read in O(1) on the disk paths
+DISKS_PER_SOC_VIEW = "disks_per_soc"
+db.create_view(SYSTEM_DISK_COLLECTION, DISKS_PER_SOC_VIEW, "mv200_ip")
+
 
 async def _create_system_disk(data: block_schemas.BareMetalCreate, creator: str, rebuild=False):
     disk_data = data.system_disk
@@ -150,6 +162,8 @@ async def _create_system_disk(data: block_schemas.BareMetalCreate, creator: str,
             })
         LOG.info(f"Virtual block device creation response for disk {disk_id}:"
                  f" code={res.code}, message={res.message}")
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Failed to create virtblk for disk {disk_id} in {soc_ip}, error: {e}")
         raise exceptions.VblkCreateException(str(e))
@@ -225,7 +239,7 @@ async def _create_system_disk(data: block_schemas.BareMetalCreate, creator: str,
 
     # Insert new system disk to database
     LOG.info(f"Inserting disk {disk_id} into database")
-    db.insert(SYSTEM_DISK_COLLECTION, disk_dict)
+    await db.insert(SYSTEM_DISK_COLLECTION, disk_dict)
     LOG.info(f"Successfully created system disk {disk_id}")
 
     efi_status = 0
@@ -268,8 +282,7 @@ async def _delete_system_disk(disk_id, rebuild=False):
     dpuagentclient = get_dpuagentclient(soc_ip)
 
     # Check if this is the last disk on the SOC
-    disks_with_same_ip = db.find(SYSTEM_DISK_COLLECTION, {"mv200_ip": soc_ip})
-    is_last_disk = len(disks_with_same_ip) == 1
+    is_last_disk = db.view(SYSTEM_DISK_COLLECTION, DISKS_PER_SOC_VIEW).count(soc_ip) == 1
     LOG.info(f"Disk {disk_id} is {'last' if is_last_disk else 'not last'} disk on SOC {soc_ip}")
 
     efi_status = 0
@@ -303,6 +316,8 @@ async def _delete_system_disk(disk_id, rebuild=False):
                 "uuid": existing_disks["blk_id"]})
         LOG.info("Virtual block device deletion response for disk "
                  f"{disk_id}: code={res.code}, message={res.message}")
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Failed to delete virtblk for disk {disk_id} in {soc_ip}, error: {e}")
         raise exceptions.VblkDeleteException(str(e))
@@ -340,7 +355,7 @@ async def _delete_system_disk(disk_id, rebuild=False):
 
     # Delete disk record from database
     LOG.info(f"Deleting disk {disk_id} record from database")
-    deleted_count = db.delete(SYSTEM_DISK_COLLECTION, {"id": disk_id})
+    deleted_count = await db.delete(SYSTEM_DISK_COLLECTION, {"id": disk_id})
     if deleted_count == 0:
         LOG.error(f"Failed to delete disk {disk_id} record from database")
         raise HTTPException(
@@ -408,13 +423,30 @@ async def create_system_disk(
 
 
 @router.get("/system-disks", response_model=List[block_schemas.SystemDisk])
-async def get_all_system_disks():
+async def get_all_system_disks(
+    mv200_id: Optional[str] = Query(None, description="Only disks of this MV200 server"),
+    mv200_ip: Optional[str] = Query(None, description="Only disks of this MV200 IP address"),
+    image_id: Optional[str] = Query(None, description="Only disks cloned from this image"),
+    creator: Optional[str] = Query(None, description="Only disks of this creator"),
+    sort: Optional[str] = Query(None, description="Field to sort by, '-' prefix for descending"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of disks"),
+    offset: int = Query(0, ge=0, description="Number of disks to skip")
+):
     """
-    Get all system disks list
+    Get all system disks list, optionally filtered and paged
     """
     LOG.info("Received request to get all system disks")
+    if sort and sort.lstrip("-") not in block_schemas.SystemDisk.__fields__:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort system disks by '{sort}'"
+        )
+    filters = {"mv200_id": mv200_id, "mv200_ip": mv200_ip,
+               "image_id": image_id, "creator": creator}
     try:
-        disks = db.find(SYSTEM_DISK_COLLECTION, {})
+        disks = db.find(SYSTEM_DISK_COLLECTION,
+                        {k: v for k, v in filters.items() if v is not None},
+                        sort=sort, limit=limit, offset=offset)
         LOG.info(f"Retrieved {len(disks)} system disks from database")
         return disks
     except Exception as e:
@@ -469,14 +501,26 @@ async def flatten_system_disk(disk_id: str):
         rbd_api = ceph_api.RbdApi(cephclient)
         rbd_api.api_block_image_image_spec_flatten_post(
             image_spec=quote(f"{RBD_POOL}/{disk_id}", safe=""))
-        existing_disk["flatten"] = True
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Failed to flatten rbd image for disk {disk_id}, error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
-    db.update_one(SYSTEM_DISK_COLLECTION, {"id": disk_id}, existing_disk)
+    # No lock is held across the Ceph call, only record the flatten if the
+    # disk did not change meanwhile
+    try:
+        await db.update_one(SYSTEM_DISK_COLLECTION, {"id": disk_id}, {"flatten": True},
+                            expected_version=existing_disk.get(REVISION_KEY, 0))
+    except ConflictError as e:
+        LOG.warning(f"System disk {disk_id} changed while flattening: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="System disk changed while flattening, retry the request"
+        )
+    existing_disk["flatten"] = True
     LOG.info(f"Successfully flattened RBD image for disk {disk_id}")
     return existing_disk
 
@@ -501,7 +545,7 @@ async def update_system_disk(disk_id: str, update_data: block_schemas.SystemDisk
         LOG.info(f"Updating system disk {disk_id} with fields: {list(update_dict.keys())}")
 
         if update_dict:
-            db.update_one(SYSTEM_DISK_COLLECTION, {"id": disk_id}, update_dict)
+            await db.update_one(SYSTEM_DISK_COLLECTION, {"id": disk_id}, update_dict)
             LOG.info(f"Successfully updated system disk {disk_id} in database")
         else:
             LOG.info(f"No fields to update for system disk {disk_id}")
@@ -657,7 +701,7 @@ async def save_block_to_new_image(disk_id: str, data: block_schemas.UploadToImag
     else:
         # Insert new image to database
         LOG.info(f"Inserting new image {image_id} into database")
-        db.insert(IMAGE_COLLECTION, image_dict)
+        await db.insert(IMAGE_COLLECTION, image_dict)
         LOG.info(f"Successfully created new image {image_id} from disk {disk_id}")
 
     # Return the created image information
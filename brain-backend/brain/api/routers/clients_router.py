@@ -0,0 +1,23 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+from fastapi import APIRouter, Depends
+import logging
+
+from brain.auth import authenticate_user
+from brain.utils import circuit_breaker_states, client_pool_stats
+
+router = APIRouter(dependencies=[Depends(authenticate_user)])
+LOG = logging.getLogger(__name__)
+
+
+@router.get("/clients/stats")
+async def get_client_stats():
+    """Statistics of the Ceph and dpuagent client pools"""
+    return client_pool_stats()
+
+
+@router.get("/clients/breakers")
+async def get_circuit_breakers():
+    """Ceph clusters and SOCs found unreachable, and the state of their circuit"""
+    return circuit_breaker_states()
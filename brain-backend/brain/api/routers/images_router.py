@@ -10,18 +10,22 @@ from urllib.parse import quote
 from brain.api.schemas import image_schemas
 from brain.auth import authenticate_user
 from brain.utils import get_cephclient
-from brain.json_db import JSONDocumentDB
+from brain.json_db import AsyncJSONDocumentDB
 from brain.clients.ceph import api
 from brain.clients.ceph.exceptions import ApiException
 
 router = APIRouter(dependencies=[Depends(authenticate_user)])
 LOG = logging.getLogger(__name__)
-db = JSONDocumentDB()
+db = AsyncJSONDocumentDB()
 
 # Collection name
 IMAGE_COLLECTION = "images"
 SNAP_NAME = "brain_snap"
 
+# Secondary indexes
+db.create_index(IMAGE_COLLECTION, "name")
+db.create_index(IMAGE_COLLECTION, "ceph_location")
+
 
 @router.post("/images", response_model=image_schemas.Image, 
              status_code=status.HTTP_201_CREATED)
@@ -90,7 +94,7 @@ async def create_image(image_data: image_schemas.ImageCreate):
         raise
     else:
         # Insert new image
-        db.insert(IMAGE_COLLECTION, image_dict)
+        await db.insert(IMAGE_COLLECTION, image_dict)
         LOG.info(f"Successfully created image {image_id} in database")
 
     LOG.info(f"Successfully completed image creation for {image_id}")
@@ -172,7 +176,7 @@ async def update_image(image_id: str, update_data: image_schemas.ImageUpdate):
         exclude_unset=True).items() if v is not None}
     if update_dict:
         LOG.info(f"Updating image {image_id} with fields: {list(update_dict.keys())}")
-        updated_count = db.update(IMAGE_COLLECTION, {"id": image_id}, update_dict)
+        updated_count = await db.update(IMAGE_COLLECTION, {"id": image_id}, update_dict)
         if updated_count == 0:
             LOG.error(f"Failed to update image {image_id} in database")
             raise HTTPException(
@@ -249,7 +253,7 @@ async def delete_image(image_id: str):
                  "is recorded through Brain")
 
     LOG.info(f"Deleting image {image_id} record from database")
-    deleted_count = db.delete(IMAGE_COLLECTION, {"id": image_id})
+    deleted_count = await db.delete(IMAGE_COLLECTION, {"id": image_id})
     if deleted_count == 0:
         LOG.error(f"Failed to delete image {image_id} from database")
         raise HTTPException(
@@ -5,21 +5,26 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 import logging
 import uuid
+import httpx
 import urllib3
 
-from brain.json_db import JSONDocumentDB
+from brain.json_db import AsyncJSONDocumentDB
 from brain.auth import authenticate_user
 from brain.api.schemas import mv200_schemas
 from brain.clients.dpuagent import api as dpuagentApi
-from brain.utils.get_client import get_dpuagentclient
+from brain.utils.get_client import get_async_dpuagentclient, get_dpuagentclient
 
 router = APIRouter(dependencies=[Depends(authenticate_user)])
 LOG = logging.getLogger(__name__)
-db = JSONDocumentDB()
+db = AsyncJSONDocumentDB()
 
 # Collection name
 MV_SERVER_COLLECTION = "mv_servers"
 
+# Secondary indexes
+db.create_index(MV_SERVER_COLLECTION, "name")
+db.create_index(MV_SERVER_COLLECTION, "ip_address")
+
 
 @router.post("/mv-servers", response_model=mv200_schemas.MVServer,
              status_code=status.HTTP_201_CREATED)
@@ -76,7 +81,7 @@ async def create_mv_server(server_data: mv200_schemas.MVServerCreate):
         LOG.error(f"Failed to get clouddisk_enable for {server_data.ip_address}, error: {e}")
 
     # Insert new server
-    db.insert(MV_SERVER_COLLECTION, server_dict)
+    await db.insert(MV_SERVER_COLLECTION, server_dict)
     LOG.info(f"Successfully created MV server {server_id}")
 
     # Return the created server information
@@ -110,9 +115,12 @@ async def get_mv_server(server_id: str):
         )
 
     try:
-        setting_api = dpuagentApi.SettingsApi(get_dpuagentclient(server["ip_address"]))
-        res = setting_api.get_clouddisk_enable_setting_dpu_agent_v1_settings_clouddisk_enable_get(
-            _request_timeout=2)
+        # Concurrent requests for the same SOC share one call to its agent
+        setting_api = dpuagentApi.SettingsApi(
+            await get_async_dpuagentclient(server["ip_address"]))
+        res = await (setting_api.
+                     get_clouddisk_enable_setting_dpu_agent_v1_settings_clouddisk_enable_get(
+                         _request_timeout=2))
         if res.code != 0:
             LOG.error(f"Failed to get clouddisk enable status for SOC "
                       f"{server['ip_address']}, message: {res.message}")
@@ -121,7 +129,8 @@ async def get_mv_server(server_id: str):
             LOG.info(f"Clouddisk enable status for SOC {server['ip_address']}: "
                      f"{res.clouddisk_enable}")
 
-    except (urllib3.exceptions.ConnectTimeoutError, urllib3.exceptions.MaxRetryError):
+    except (urllib3.exceptions.ConnectTimeoutError, urllib3.exceptions.MaxRetryError,
+            httpx.TransportError):
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=f"Failed to connect to DPU agent at {server['ip_address']}"
@@ -191,7 +200,7 @@ async def update_mv_server(server_id: str, update_data: mv200_schemas.MVServerUp
             else:
                 LOG.info(f"Successfully updated clouddisk enable status for SOC {soc_ip}")
 
-        updated_count = db.update(MV_SERVER_COLLECTION, {"id": server_id}, update_dict)
+        updated_count = await db.update(MV_SERVER_COLLECTION, {"id": server_id}, update_dict)
         if updated_count == 0:
             LOG.error(f"Failed to update MV server {server_id} in database")
             raise HTTPException(
@@ -229,7 +238,7 @@ async def delete_mv_server(server_id: str):
     LOG.info(f"Deleting MV server {server_id} ({server_name}) with IP {server_ip}")
 
     # Delete server
-    deleted_count = db.delete(MV_SERVER_COLLECTION, {"id": server_id})
+    deleted_count = await db.delete(MV_SERVER_COLLECTION, {"id": server_id})
     if deleted_count == 0:
         LOG.error(f"Failed to delete MV server {server_id} from database")
         raise HTTPException(
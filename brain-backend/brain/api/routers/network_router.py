@@ -1,26 +1,29 @@
 # Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
 # All rights reserved.
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 import logging
-from typing import List
+from typing import List, Optional
 import uuid
 import random
 
 from brain.auth import authenticate_user
-from brain.json_db import JSONDocumentDB
+from brain.json_db import AsyncJSONDocumentDB
 from brain.api.schemas import network_schemas
 from brain.clients.dpuagent import api
-from brain.utils.get_client import get_dpuagentclient
+from brain.utils.get_client import get_async_dpuagentclient, get_dpuagentclient
 from brain import exceptions
 
 router = APIRouter(dependencies=[Depends(authenticate_user)])
 LOG = logging.getLogger(__name__)
-db = JSONDocumentDB()
+db = AsyncJSONDocumentDB()
 
 NETWORK_COLLECTION = "networks"
 MV_SERVER_COLLECTION = "mv_servers"
 
+# Secondary indexes
+db.create_index(NETWORK_COLLECTION, "mv200_id")
+
 
 @router.post("/networks", response_model=network_schemas.InterfaceInfo)
 async def create_interface(data: network_schemas.InterfaceCreate):
@@ -66,6 +69,8 @@ async def create_interface(data: network_schemas.InterfaceCreate):
         LOG.info(
             f"XSC network created for interface {interface_id}, uuid={res.uuid}"
         )
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Exception creating XSC network for {interface_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -90,6 +95,8 @@ async def create_interface(data: network_schemas.InterfaceCreate):
             )
             raise HTTPException(status_code=500, detail=res.message)
         LOG.info(f"OVS flow added for interface {interface_id} successfully")
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Exception adding OVS flow for {interface_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -108,7 +115,7 @@ async def create_interface(data: network_schemas.InterfaceCreate):
         raise
 
     interface_data["id"] = interface_id
-    db.insert(NETWORK_COLLECTION, interface_data)
+    await db.insert(NETWORK_COLLECTION, interface_data)
     LOG.info(f"Interface {interface_id} inserted into database")
     return interface_data
 
@@ -142,6 +149,8 @@ async def delete_interface(data: network_schemas.InterfaceDelete):
             )
             raise HTTPException(status_code=500, detail=res.message)
         LOG.info(f"XSC network for interface {data.id} deleted successfully")
+    except exceptions.HostUnavailable:
+        raise
     except Exception as e:
         LOG.error(f"Exception deleting XSC network for {data.id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -159,7 +168,7 @@ async def delete_interface(data: network_schemas.InterfaceDelete):
         LOG.error(f"Failed to save checkpoint after deleting interface {data.id}: {e}")
         raise
 
-    db.delete(NETWORK_COLLECTION, {"id": data.id})
+    await db.delete(NETWORK_COLLECTION, {"id": data.id})
     LOG.info(f"Interface {data.id} deleted successfully")
     return
 
@@ -168,7 +177,7 @@ async def delete_interface(data: network_schemas.InterfaceDelete):
 async def update_interface_description(data: network_schemas.InterfaceUpdate):
     """Update description of an existing interface"""
     LOG.info(f"Updating description for interface {data.id}: {data.description}")
-    updated = db.update(
+    updated = await db.update(
         NETWORK_COLLECTION, {"id": data.id}, {"description": data.description}
     )
     if not updated:
@@ -181,10 +190,21 @@ async def update_interface_description(data: network_schemas.InterfaceUpdate):
 
 
 @router.get("/networks", response_model=List[network_schemas.InterfaceInfo])
-async def list_interfaces():
-    """List all network interfaces"""
+async def list_interfaces(
+    mv200_id: Optional[str] = Query(None, description="Only interfaces of this SoC"),
+    vlan_tag: Optional[int] = Query(None, description="Only interfaces of this VLAN"),
+    sort: Optional[str] = Query(None, description="Field to sort by, '-' prefix for descending"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of interfaces"),
+    offset: int = Query(0, ge=0, description="Number of interfaces to skip")
+):
+    """List all network interfaces, optionally filtered and paged"""
     LOG.info("Listing all network interfaces")
-    interfaces = db.find(NETWORK_COLLECTION)
+    if sort and sort.lstrip("-") not in network_schemas.InterfaceInfo.__fields__:
+        raise HTTPException(status_code=400, detail=f"Cannot sort interfaces by '{sort}'")
+    filters = {"mv200_id": mv200_id, "vlan_tag": vlan_tag}
+    interfaces = db.find(NETWORK_COLLECTION,
+                         {k: v for k, v in filters.items() if v is not None},
+                         sort=sort, limit=limit, offset=offset)
     LOG.info(f"Found {len(interfaces)} interfaces")
     return interfaces
 
@@ -205,8 +225,9 @@ async def get_interface(interface_id: str):
             status_code=status.HTTP_404_NOT_FOUND, detail="MV server not found"
         )
     try:
-        dpuagentclient = get_dpuagentclient(server["ip_address"])
-        res = api.RdmaApi(dpuagentclient).list_nics_info_dpu_agent_v1_rdma_list_nics_get()
+        # Concurrent requests for the same SOC share one call to its agent
+        dpuagentclient = await get_async_dpuagentclient(server["ip_address"])
+        res = await api.RdmaApi(dpuagentclient).list_nics_info_dpu_agent_v1_rdma_list_nics_get()
         if res.code != 0:
             LOG.error()
             raise HTTPException(
@@ -0,0 +1,14 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class RestoredCollection(BaseModel):
+    documents: int = Field(..., description="Number of documents restored")
+    rev: int = Field(..., description="Revision of the collection after the restore")
+
+
+class RestoreResult(BaseModel):
+    collections: Dict[str, RestoredCollection]
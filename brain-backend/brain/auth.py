@@ -25,8 +25,17 @@ def load_or_create_key(path: str) -> str:
             return f.read().strip()
     key = secrets.token_hex(32)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
+    tmp_path = f"{path}.{os.getpid()}"
+    with open(tmp_path, "w") as f:
         f.write(key)
+    try:
+        # Workers start together, only the first one may create the key
+        os.link(tmp_path, path)
+    except FileExistsError:
+        with open(path, "r") as f:
+            key = f.read().strip()
+    finally:
+        os.remove(tmp_path)
     return key
 
 
@@ -0,0 +1,190 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Point-in-time backups of the JSONDocumentDB collections.
+
+Usage: python -m brain.backup create [-o FILE] [--compress] [-c NAME ...]
+       python -m brain.backup restore FILE
+
+A backup is a JSON Lines stream, gzip compressed on request: a header
+line describing the collections, then one ``{"c": name, "doc": {...}}``
+line per document. It is taken from the in-memory state, so the service
+keeps writing while it is produced, and restored collection by collection
+with a single storage write each.
+"""
+
+import argparse
+import datetime
+import gzip
+import io
+import json
+import logging
+import sys
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from brain.json_db import DB_ENGINE, JSONDocumentDB, check_collection_name, check_documents
+
+LOG = logging.getLogger(__name__)
+
+BACKUP_FORMAT = "brain-backup"
+BACKUP_VERSION = 1
+# Size of the chunks the backup stream is made of
+CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _lines(exported: Dict[str, tuple]) -> Iterator[bytes]:
+    header = {
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "engine": DB_ENGINE,
+        "collections": {name: {"rev": rev, "documents": len(docs)}
+                        for name, (rev, docs) in exported.items()},
+    }
+    yield json.dumps(header).encode() + b"\n"
+    for name, (_, docs) in exported.items():
+        for doc in docs:
+            yield json.dumps({"c": name, "doc": doc}, separators=(",", ":")).encode() + b"\n"
+
+
+def stream(exported: Dict[str, tuple], compress: bool = False) -> Iterator[bytes]:
+    """Serialize the result of ``JSONDocumentDB.export`` in chunks."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    buf = []
+    size = 0
+    for line in _lines(exported):
+        buf.append(line)
+        size += len(line)
+        if size < CHUNK_SIZE:
+            continue
+        chunk = b"".join(buf)
+        buf, size = [], 0
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    chunk = b"".join(buf)
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def dump(db: JSONDocumentDB, collections: Optional[Iterable[str]] = None,
+         compress: bool = False) -> Iterator[bytes]:
+    """Back up ``collections``, all by default, as a stream of chunks."""
+    exported = db.export(collections)
+    LOG.info(f"Backing up {sum(len(docs) for _, docs in exported.values())} documents "
+             f"of {len(exported)} collections")
+    return stream(exported, compress)
+
+
+def read(fileobj: BinaryIO) -> Dict[str, List[Dict[str, Any]]]:
+    """Parse a backup, compressed or not, into the documents of each collection.
+
+    The whole backup is validated before anything is returned, so that a
+    truncated or corrupted file never gets partially restored.
+    """
+    if not fileobj.seekable():
+        fileobj = io.BytesIO(fileobj.read())
+    magic = fileobj.read(2)
+    fileobj.seek(-len(magic), io.SEEK_CUR)
+    if magic == _GZIP_MAGIC:
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+
+    try:
+        header = json.loads(fileobj.readline() or b"null")
+    except (OSError, EOFError, ValueError, zlib.error) as e:
+        raise ValueError(f"Not a backup: {e}")
+    if not isinstance(header, dict) or header.get("format") != BACKUP_FORMAT:
+        raise ValueError("Not a backup")
+    if header.get("version") != BACKUP_VERSION:
+        raise ValueError(f"Unsupported backup version {header.get('version')}")
+
+    collections = header.get("collections")
+    if not isinstance(collections, dict) or not all(
+            isinstance(meta, dict) and isinstance(meta.get("documents"), int)
+            for meta in collections.values()):
+        raise ValueError("Corrupted backup: invalid collections in the header")
+    for name in collections:
+        check_collection_name(name)
+
+    data = {name: [] for name in collections}
+    try:
+        for number, line in enumerate(fileobj, start=2):
+            if not line.endswith(b"\n"):
+                raise ValueError(f"Truncated backup at line {number}")
+            record = json.loads(line)
+            if not isinstance(record, dict) or "doc" not in record:
+                raise ValueError(f"Corrupted backup at line {number}")
+            if record.get("c") not in data:
+                raise ValueError(f"Unknown collection '{record.get('c')}' at line {number}")
+            data[record["c"]].append(record["doc"])
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"Corrupted backup: {e}")
+    for name, meta in collections.items():
+        if len(data[name]) != meta["documents"]:
+            raise ValueError(f"Truncated backup: {len(data[name])} of {meta['documents']} "
+                             f"documents of '{name}'")
+        check_documents(name, data[name])
+    return data
+
+
+def restore(db: JSONDocumentDB, fileobj: BinaryIO) -> Dict[str, Dict[str, int]]:
+    """Replace the collections of a backup with its content.
+
+    Collections missing from the backup are left alone.
+    """
+    result = {}
+    for name, docs in read(fileobj).items():
+        result[name] = {"documents": len(docs), "rev": db.restore(name, docs)}
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Back up or restore the Brain database")
+    parser.add_argument("--db-dir", help="database directory, the service one by default")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="write a backup")
+    create_parser.add_argument("-o", "--output", help="backup file, standard output by default")
+    create_parser.add_argument("--compress", action="store_true", help="gzip the backup")
+    create_parser.add_argument("-c", "--collection", action="append", dest="collections",
+                               help="collection to back up, all by default")
+    restore_parser = subparsers.add_parser("restore", help="restore a backup")
+    restore_parser.add_argument("path", help="backup file, '-' for standard input")
+    args = parser.parse_args(argv)
+
+    db = JSONDocumentDB()
+    if args.db_dir:
+        db.db_dir = args.db_dir
+
+    try:
+        if args.command == "create":
+            chunks = dump(db, args.collections, args.compress)
+            if args.output:
+                with open(args.output, "wb") as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+            else:
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+        else:
+            if args.path == "-":
+                results = restore(db, sys.stdin.buffer)
+            else:
+                with open(args.path, "rb") as f:
+                    results = restore(db, f)
+            for name, result in results.items():
+                print(f"{name}: {result['documents']} documents, revision {result['rev']}")
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
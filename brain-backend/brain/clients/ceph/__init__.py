@@ -18,51 +18,72 @@
 
 __version__ = "1.0.0"
 
-# import apis into sdk package
-from brain.clients.ceph.api.auth_api import AuthApi
-from brain.clients.ceph.api.pool_api import PoolApi
-from brain.clients.ceph.api.rbd_api import RbdApi
-from brain.clients.ceph.api.rbd_snapshot_api import RbdSnapshotApi
-
-# import ApiClient
-from brain.clients.ceph.api_response import ApiResponse
-from brain.clients.ceph.api_client import ApiClient
-from brain.clients.ceph.configuration import Configuration
-from brain.clients.ceph.exceptions import OpenApiException
-from brain.clients.ceph.exceptions import ApiTypeError
-from brain.clients.ceph.exceptions import ApiValueError
-from brain.clients.ceph.exceptions import ApiKeyError
-from brain.clients.ceph.exceptions import ApiAttributeError
-from brain.clients.ceph.exceptions import ApiException
-
-# import models into sdk package
-from brain.clients.ceph.models.api_block_image_image_spec_copy_post_request import ApiBlockImageImageSpecCopyPostRequest
-from brain.clients.ceph.models.api_block_image_image_spec_put_request import ApiBlockImageImageSpecPutRequest
-from brain.clients.ceph.models.api_block_image_image_spec_snap_post_request import ApiBlockImageImageSpecSnapPostRequest
-from brain.clients.ceph.models.api_block_image_image_spec_snap_snapshot_name_clone_post_request import ApiBlockImageImageSpecSnapSnapshotNameClonePostRequest
-from brain.clients.ceph.models.api_block_image_image_spec_snap_snapshot_name_put_request import ApiBlockImageImageSpecSnapSnapshotNamePutRequest
-from brain.clients.ceph.models.auth_request import AuthRequest
-from brain.clients.ceph.models.auth_response import AuthResponse
-from brain.clients.ceph.models.block_image import BlockImage
-from brain.clients.ceph.models.block_image_post_request import BlockImagePostRequest
-from brain.clients.ceph.models.compression_inner import CompressionInner
-from brain.clients.ceph.models.hit_set_params import HitSetParams
-from brain.clients.ceph.models.image_snapshot import ImageSnapshot
-from brain.clients.ceph.models.last_pg_merge_meta import LastPGMergeMeta
-from brain.clients.ceph.models.mirror_inner import MirrorInner
-from brain.clients.ceph.models.mirror_inner_one_of import MirrorInnerOneOf
-from brain.clients.ceph.models.mirror_inner_one_of1 import MirrorInnerOneOf1
-from brain.clients.ceph.models.pool import Pool
-from brain.clients.ceph.models.pool_configuration_item import PoolConfigurationItem
-from brain.clients.ceph.models.pool_get_response_element import PoolGetResponseElement
-from brain.clients.ceph.models.pool_get_response_element_options import PoolGetResponseElementOptions
-from brain.clients.ceph.models.pool_post_request import PoolPostRequest
-from brain.clients.ceph.models.pool_post_request_one_of import PoolPostRequestOneOf
-from brain.clients.ceph.models.pool_post_request_one_of1 import PoolPostRequestOneOf1
-from brain.clients.ceph.models.pool_post_response import PoolPostResponse
-from brain.clients.ceph.models.pool_stats import PoolStats
-from brain.clients.ceph.models.quotas_inner import QuotasInner
-from brain.clients.ceph.models.rbdqo_s_inner import RBDQoSInner
-from brain.clients.ceph.models.read_balance import ReadBalance
-from brain.clients.ceph.models.stat_entry import StatEntry
-from brain.clients.ceph.models.strip_inner import StripInner
+import importlib
+
+# The names of the package are imported from their module on first use,
+# so that importing the client, or one API of it, does not import every
+# API and model of the whole API
+_LAZY_IMPORTS = {
+    # import apis into sdk package
+    "AuthApi": "brain.clients.ceph.api.auth_api",
+    "PoolApi": "brain.clients.ceph.api.pool_api",
+    "RbdApi": "brain.clients.ceph.api.rbd_api",
+    "RbdSnapshotApi": "brain.clients.ceph.api.rbd_snapshot_api",
+
+    # import ApiClient
+    "ApiResponse": "brain.clients.ceph.api_response",
+    "ApiClient": "brain.clients.ceph.api_client",
+    "Configuration": "brain.clients.ceph.configuration",
+    "OpenApiException": "brain.clients.ceph.exceptions",
+    "ApiTypeError": "brain.clients.ceph.exceptions",
+    "ApiValueError": "brain.clients.ceph.exceptions",
+    "ApiKeyError": "brain.clients.ceph.exceptions",
+    "ApiAttributeError": "brain.clients.ceph.exceptions",
+    "ApiException": "brain.clients.ceph.exceptions",
+
+    # import models into sdk package
+    "ApiBlockImageImageSpecCopyPostRequest": "brain.clients.ceph.models.api_block_image_image_spec_copy_post_request",
+    "ApiBlockImageImageSpecPutRequest": "brain.clients.ceph.models.api_block_image_image_spec_put_request",
+    "ApiBlockImageImageSpecSnapPostRequest": "brain.clients.ceph.models.api_block_image_image_spec_snap_post_request",
+    "ApiBlockImageImageSpecSnapSnapshotNameClonePostRequest": "brain.clients.ceph.models.api_block_image_image_spec_snap_snapshot_name_clone_post_request",
+    "ApiBlockImageImageSpecSnapSnapshotNamePutRequest": "brain.clients.ceph.models.api_block_image_image_spec_snap_snapshot_name_put_request",
+    "AuthRequest": "brain.clients.ceph.models.auth_request",
+    "AuthResponse": "brain.clients.ceph.models.auth_response",
+    "BlockImage": "brain.clients.ceph.models.block_image",
+    "BlockImagePostRequest": "brain.clients.ceph.models.block_image_post_request",
+    "CompressionInner": "brain.clients.ceph.models.compression_inner",
+    "HitSetParams": "brain.clients.ceph.models.hit_set_params",
+    "ImageSnapshot": "brain.clients.ceph.models.image_snapshot",
+    "LastPGMergeMeta": "brain.clients.ceph.models.last_pg_merge_meta",
+    "MirrorInner": "brain.clients.ceph.models.mirror_inner",
+    "MirrorInnerOneOf": "brain.clients.ceph.models.mirror_inner_one_of",
+    "MirrorInnerOneOf1": "brain.clients.ceph.models.mirror_inner_one_of1",
+    "Pool": "brain.clients.ceph.models.pool",
+    "PoolConfigurationItem": "brain.clients.ceph.models.pool_configuration_item",
+    "PoolGetResponseElement": "brain.clients.ceph.models.pool_get_response_element",
+    "PoolGetResponseElementOptions": "brain.clients.ceph.models.pool_get_response_element_options",
+    "PoolPostRequest": "brain.clients.ceph.models.pool_post_request",
+    "PoolPostRequestOneOf": "brain.clients.ceph.models.pool_post_request_one_of",
+    "PoolPostRequestOneOf1": "brain.clients.ceph.models.pool_post_request_one_of1",
+    "PoolPostResponse": "brain.clients.ceph.models.pool_post_response",
+    "PoolStats": "brain.clients.ceph.models.pool_stats",
+    "QuotasInner": "brain.clients.ceph.models.quotas_inner",
+    "RBDQoSInner": "brain.clients.ceph.models.rbdqo_s_inner",
+    "ReadBalance": "brain.clients.ceph.models.read_balance",
+    "StatEntry": "brain.clients.ceph.models.stat_entry",
+    "StripInner": "brain.clients.ceph.models.strip_inner",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -2,9 +2,28 @@
 
 # flake8: noqa
 
-# import apis into api package
-from brain.clients.ceph.api.auth_api import AuthApi
-from brain.clients.ceph.api.pool_api import PoolApi
-from brain.clients.ceph.api.rbd_api import RbdApi
-from brain.clients.ceph.api.rbd_snapshot_api import RbdSnapshotApi
+import importlib
 
+# Each API is imported on first use, with the models its operations take
+# and return only
+_LAZY_IMPORTS = {
+    # import apis into api package
+    "AuthApi": "brain.clients.ceph.api.auth_api",
+    "PoolApi": "brain.clients.ceph.api.pool_api",
+    "RbdApi": "brain.clients.ceph.api.rbd_api",
+    "RbdSnapshotApi": "brain.clients.ceph.api.rbd_snapshot_api",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
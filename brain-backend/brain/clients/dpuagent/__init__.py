@@ -18,75 +18,96 @@
 
 __version__ = "1.0.0"
 
-# import apis into sdk package
-from brain.clients.dpuagent.api.auth_api import AuthApi
-from brain.clients.dpuagent.api.cloudinit_api import CloudinitApi
-from brain.clients.dpuagent.api.ovsflow_api import OvsflowApi
-from brain.clients.dpuagent.api.pcie_api import PcieApi
-from brain.clients.dpuagent.api.rdma_api import RdmaApi
-from brain.clients.dpuagent.api.recovery_api import RecoveryApi
-from brain.clients.dpuagent.api.settings_api import SettingsApi
-from brain.clients.dpuagent.api.usage_api import UsageApi
-from brain.clients.dpuagent.api.vblk_api import VblkApi
-from brain.clients.dpuagent.api.version_api import VersionApi
-from brain.clients.dpuagent.api.xscnet_api import XscnetApi
-
-# import ApiClient
-from brain.clients.dpuagent.api_response import ApiResponse
-from brain.clients.dpuagent.api_client import ApiClient
-from brain.clients.dpuagent.configuration import Configuration
-from brain.clients.dpuagent.exceptions import OpenApiException
-from brain.clients.dpuagent.exceptions import ApiTypeError
-from brain.clients.dpuagent.exceptions import ApiValueError
-from brain.clients.dpuagent.exceptions import ApiKeyError
-from brain.clients.dpuagent.exceptions import ApiAttributeError
-from brain.clients.dpuagent.exceptions import ApiException
-
-# import models into sdk package
-from brain.clients.dpuagent.models.backend_specific import BackendSpecific
-from brain.clients.dpuagent.models.base_response_body import BaseResponseBody
-from brain.clients.dpuagent.models.bdev_info import BdevInfo
-from brain.clients.dpuagent.models.bdev_qos_info_response import BdevQosInfoResponse
-from brain.clients.dpuagent.models.cloud_disk_enable_request import CloudDiskEnableRequest
-from brain.clients.dpuagent.models.cloud_disk_response import CloudDiskResponse
-from brain.clients.dpuagent.models.cloud_init_request import CloudInitRequest
-from brain.clients.dpuagent.models.cloud_init_response import CloudInitResponse
-from brain.clients.dpuagent.models.controller_info import ControllerInfo
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_create_request import DpuagentApiV1SchemasVblkSchemasCreateRequest
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_create_response_body import DpuagentApiV1SchemasVblkSchemasCreateResponseBody
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_delete_request import DpuagentApiV1SchemasVblkSchemasDeleteRequest
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_create_request import DpuagentApiV1SchemasXscnetSchemasCreateRequest
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_create_response_body import DpuagentApiV1SchemasXscnetSchemasCreateResponseBody
-from brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_delete_request import DpuagentApiV1SchemasXscnetSchemasDeleteRequest
-from brain.clients.dpuagent.models.dscp2_prio_request import Dscp2PrioRequest
-from brain.clients.dpuagent.models.dscp_request import DscpRequest
-from brain.clients.dpuagent.models.ethernet import Ethernet
-from brain.clients.dpuagent.models.http_validation_error import HTTPValidationError
-from brain.clients.dpuagent.models.location_inner import LocationInner
-from brain.clients.dpuagent.models.mode import Mode
-from brain.clients.dpuagent.models.network_config import NetworkConfig
-from brain.clients.dpuagent.models.nic_info import NicInfo
-from brain.clients.dpuagent.models.nics_info_response import NicsInfoResponse
-from brain.clients.dpuagent.models.ovsflow_delete_request import OvsflowDeleteRequest
-from brain.clients.dpuagent.models.ovsflow_request import OvsflowRequest
-from brain.clients.dpuagent.models.pcp_request import PcpRequest
-from brain.clients.dpuagent.models.pfc_request import PfcRequest
-from brain.clients.dpuagent.models.qo_s_request import QoSRequest
-from brain.clients.dpuagent.models.qos_info import QosInfo
-from brain.clients.dpuagent.models.qos_ratio_request import QosRatioRequest
-from brain.clients.dpuagent.models.qos_response import QosResponse
-from brain.clients.dpuagent.models.qos_set_request import QosSetRequest
-from brain.clients.dpuagent.models.recovery_mode_request import RecoveryModeRequest
-from brain.clients.dpuagent.models.recovery_status import RecoveryStatus
-from brain.clients.dpuagent.models.recovery_status_request import RecoveryStatusRequest
-from brain.clients.dpuagent.models.recovery_status_response import RecoveryStatusResponse
-from brain.clients.dpuagent.models.route import Route
-from brain.clients.dpuagent.models.to import To
-from brain.clients.dpuagent.models.token_response import TokenResponse
-from brain.clients.dpuagent.models.trust_request import TrustRequest
-from brain.clients.dpuagent.models.user import User
-from brain.clients.dpuagent.models.user_data import UserData
-from brain.clients.dpuagent.models.uuid_usage_response import UuidUsageResponse
-from brain.clients.dpuagent.models.v_blk_list_response import VBlkListResponse
-from brain.clients.dpuagent.models.validation_error import ValidationError
-from brain.clients.dpuagent.models.version_rsp import VersionRsp
+import importlib
+
+# The names of the package are imported from their module on first use,
+# so that importing the client, or one API of it, does not import every
+# API and model of the whole API
+_LAZY_IMPORTS = {
+    # import apis into sdk package
+    "AuthApi": "brain.clients.dpuagent.api.auth_api",
+    "CloudinitApi": "brain.clients.dpuagent.api.cloudinit_api",
+    "OvsflowApi": "brain.clients.dpuagent.api.ovsflow_api",
+    "PcieApi": "brain.clients.dpuagent.api.pcie_api",
+    "RdmaApi": "brain.clients.dpuagent.api.rdma_api",
+    "RecoveryApi": "brain.clients.dpuagent.api.recovery_api",
+    "SettingsApi": "brain.clients.dpuagent.api.settings_api",
+    "UsageApi": "brain.clients.dpuagent.api.usage_api",
+    "VblkApi": "brain.clients.dpuagent.api.vblk_api",
+    "VersionApi": "brain.clients.dpuagent.api.version_api",
+    "XscnetApi": "brain.clients.dpuagent.api.xscnet_api",
+
+    # import ApiClient
+    "ApiResponse": "brain.clients.dpuagent.api_response",
+    "ApiClient": "brain.clients.dpuagent.api_client",
+    "Configuration": "brain.clients.dpuagent.configuration",
+    "OpenApiException": "brain.clients.dpuagent.exceptions",
+    "ApiTypeError": "brain.clients.dpuagent.exceptions",
+    "ApiValueError": "brain.clients.dpuagent.exceptions",
+    "ApiKeyError": "brain.clients.dpuagent.exceptions",
+    "ApiAttributeError": "brain.clients.dpuagent.exceptions",
+    "ApiException": "brain.clients.dpuagent.exceptions",
+
+    # import models into sdk package
+    "BackendSpecific": "brain.clients.dpuagent.models.backend_specific",
+    "BaseResponseBody": "brain.clients.dpuagent.models.base_response_body",
+    "BdevInfo": "brain.clients.dpuagent.models.bdev_info",
+    "BdevQosInfoResponse": "brain.clients.dpuagent.models.bdev_qos_info_response",
+    "CloudDiskEnableRequest": "brain.clients.dpuagent.models.cloud_disk_enable_request",
+    "CloudDiskResponse": "brain.clients.dpuagent.models.cloud_disk_response",
+    "CloudInitRequest": "brain.clients.dpuagent.models.cloud_init_request",
+    "CloudInitResponse": "brain.clients.dpuagent.models.cloud_init_response",
+    "ControllerInfo": "brain.clients.dpuagent.models.controller_info",
+    "DpuagentApiV1SchemasVblkSchemasCreateRequest": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_create_request",
+    "DpuagentApiV1SchemasVblkSchemasCreateResponseBody": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_create_response_body",
+    "DpuagentApiV1SchemasVblkSchemasDeleteRequest": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_vblk_schemas_delete_request",
+    "DpuagentApiV1SchemasXscnetSchemasCreateRequest": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_create_request",
+    "DpuagentApiV1SchemasXscnetSchemasCreateResponseBody": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_create_response_body",
+    "DpuagentApiV1SchemasXscnetSchemasDeleteRequest": "brain.clients.dpuagent.models.dpuagent_api_v1_schemas_xscnet_schemas_delete_request",
+    "Dscp2PrioRequest": "brain.clients.dpuagent.models.dscp2_prio_request",
+    "DscpRequest": "brain.clients.dpuagent.models.dscp_request",
+    "Ethernet": "brain.clients.dpuagent.models.ethernet",
+    "HTTPValidationError": "brain.clients.dpuagent.models.http_validation_error",
+    "LocationInner": "brain.clients.dpuagent.models.location_inner",
+    "Mode": "brain.clients.dpuagent.models.mode",
+    "NetworkConfig": "brain.clients.dpuagent.models.network_config",
+    "NicInfo": "brain.clients.dpuagent.models.nic_info",
+    "NicsInfoResponse": "brain.clients.dpuagent.models.nics_info_response",
+    "OvsflowDeleteRequest": "brain.clients.dpuagent.models.ovsflow_delete_request",
+    "OvsflowRequest": "brain.clients.dpuagent.models.ovsflow_request",
+    "PcpRequest": "brain.clients.dpuagent.models.pcp_request",
+    "PfcRequest": "brain.clients.dpuagent.models.pfc_request",
+    "QoSRequest": "brain.clients.dpuagent.models.qo_s_request",
+    "QosInfo": "brain.clients.dpuagent.models.qos_info",
+    "QosRatioRequest": "brain.clients.dpuagent.models.qos_ratio_request",
+    "QosResponse": "brain.clients.dpuagent.models.qos_response",
+    "QosSetRequest": "brain.clients.dpuagent.models.qos_set_request",
+    "RecoveryModeRequest": "brain.clients.dpuagent.models.recovery_mode_request",
+    "RecoveryStatus": "brain.clients.dpuagent.models.recovery_status",
+    "RecoveryStatusRequest": "brain.clients.dpuagent.models.recovery_status_request",
+    "RecoveryStatusResponse": "brain.clients.dpuagent.models.recovery_status_response",
+    "Route": "brain.clients.dpuagent.models.route",
+    "To": "brain.clients.dpuagent.models.to",
+    "TokenResponse": "brain.clients.dpuagent.models.token_response",
+    "TrustRequest": "brain.clients.dpuagent.models.trust_request",
+    "User": "brain.clients.dpuagent.models.user",
+    "UserData": "brain.clients.dpuagent.models.user_data",
+    "UuidUsageResponse": "brain.clients.dpuagent.models.uuid_usage_response",
+    "VBlkListResponse": "brain.clients.dpuagent.models.v_blk_list_response",
+    "ValidationError": "brain.clients.dpuagent.models.validation_error",
+    "VersionRsp": "brain.clients.dpuagent.models.version_rsp",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -2,16 +2,35 @@
 
 # flake8: noqa
 
-# import apis into api package
-from brain.clients.dpuagent.api.auth_api import AuthApi
-from brain.clients.dpuagent.api.cloudinit_api import CloudinitApi
-from brain.clients.dpuagent.api.ovsflow_api import OvsflowApi
-from brain.clients.dpuagent.api.pcie_api import PcieApi
-from brain.clients.dpuagent.api.rdma_api import RdmaApi
-from brain.clients.dpuagent.api.recovery_api import RecoveryApi
-from brain.clients.dpuagent.api.settings_api import SettingsApi
-from brain.clients.dpuagent.api.usage_api import UsageApi
-from brain.clients.dpuagent.api.vblk_api import VblkApi
-from brain.clients.dpuagent.api.version_api import VersionApi
-from brain.clients.dpuagent.api.xscnet_api import XscnetApi
+import importlib
 
+# Each API is imported on first use, with the models its operations take
+# and return only
+_LAZY_IMPORTS = {
+    # import apis into api package
+    "AuthApi": "brain.clients.dpuagent.api.auth_api",
+    "CloudinitApi": "brain.clients.dpuagent.api.cloudinit_api",
+    "OvsflowApi": "brain.clients.dpuagent.api.ovsflow_api",
+    "PcieApi": "brain.clients.dpuagent.api.pcie_api",
+    "RdmaApi": "brain.clients.dpuagent.api.rdma_api",
+    "RecoveryApi": "brain.clients.dpuagent.api.recovery_api",
+    "SettingsApi": "brain.clients.dpuagent.api.settings_api",
+    "UsageApi": "brain.clients.dpuagent.api.usage_api",
+    "VblkApi": "brain.clients.dpuagent.api.vblk_api",
+    "VersionApi": "brain.clients.dpuagent.api.version_api",
+    "XscnetApi": "brain.clients.dpuagent.api.xscnet_api",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -5,6 +5,7 @@
 # All rights reserved.
 
 import logging
+import math
 from typing import Any, Optional
 
 LOG = logging.getLogger(__name__)
@@ -68,3 +69,14 @@ class CheckPointSaveException(BrainException):
 
 class DpuagentVersionError(BrainException):
     message = "The dpuagent version is not supported: %(reason)s"
+
+
+class HostUnavailable(BrainException):
+    message = "The %(service)s %(host)s is unavailable: %(reason)s"
+    code = 503
+
+    def __init__(self, message: Optional[str] = None, **kwargs: Any):
+        super().__init__(message, **kwargs)
+        retry_after = kwargs.get("retry_after")
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(math.ceil(retry_after))}
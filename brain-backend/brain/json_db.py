@@ -1,16 +1,805 @@
+import asyncio
+import contextlib
+import functools
+import itertools
 import json
+import logging
+import operator
 import threading
+import time
 import os
+import re
+import uuid
 
-from typing import Dict, List, Any
-from filelock import FileLock
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+
+from brain.storage import ENGINES, Storage, open_storage
+from brain.storage.base import PRIMARY_KEY
+from brain.storage.json_file import META_KEY
+
+LOG = logging.getLogger(__name__)
+
+# Storage engine of the database, see brain.storage.ENGINES
+DB_ENGINE = os.environ.get("BRAIN_DB_ENGINE", "json")
+# Every collection is stored in its own file of this directory
+DB_DIR = "/opt/brain/db"
+DB_SUFFIXES = {
+    "json": ".json",
+    "sqlite": ".sqlite3",
+}
+# Single file databases of previous versions, tried in order to populate an
+# empty collection. Only the JSON file was ever released
+LEGACY_DB_PATHS = [
+    ("json", "/opt/brain/db.json"),
+]
+_COLLECTION_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+# Names the storage engines use for their own data
+_RESERVED_NAMES = {META_KEY}
+
+# Every document carries the revision of the commit that last changed it
+REVISION_KEY = "_rev"
+
+
+# Operators accepted in filter values, e.g. {"size_gb": {"$gte": 10, "$lt": 100}}
+_OPERATORS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+Sort = Union[str, Sequence[Tuple[str, int]]]
+
+
+class ConflictError(ValueError):
+    """A conditional write found the document changed since it was read."""
+
+
+def _is_query(condition: Any) -> bool:
+    """Tell an operator document from a plain value compared for equality."""
+    return (isinstance(condition, dict) and bool(condition) and
+            all(isinstance(key, str) and key.startswith("$") for key in condition))
+
+
+def _test(value: Any, op: str, operand: Any) -> bool:
+    test = _OPERATORS.get(op)
+    if test is None:
+        raise ValueError(f"Unknown query operator '{op}'")
+    if op in ("$in", "$nin") and not isinstance(operand, (list, tuple, set, frozenset)):
+        raise ValueError(f"Operator '{op}' expects a list, got {operand!r}")
+    if op in _RANGE_OPERATORS and value is None:
+        return False
+    try:
+        return test(value, operand)
+    except TypeError:
+        # Values of different types are never ordered relative to each other
+        return False
+
+
+def _sort_key(value: Any) -> tuple:
+    """Order values of mixed types: missing, numbers, strings, then the rest."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, json.dumps(value, sort_keys=True, default=str))
+
+
+def _sorted(docs: Iterable[Dict[str, Any]], sort: Sort) -> List[Dict[str, Any]]:
+    if isinstance(sort, str):
+        sort = [(sort[1:], -1) if sort.startswith("-") else (sort, 1)]
+    docs = list(docs)
+    # Stable sorts from the last key to the first one
+    for field, direction in reversed(sort):
+        if direction not in (1, -1):
+            raise ValueError(f"Sort direction of '{field}' must be 1 or -1")
+        docs.sort(key=lambda doc: _sort_key(doc.get(field)), reverse=direction == -1)
+    return docs
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Iterable[str]]) -> Dict[str, Any]:
+    if projection is None:
+        return dict(doc)
+    return {field: doc[field] for field in (PRIMARY_KEY, *projection) if field in doc}
+
+
+def _index_key(value: Any) -> Any:
+    """Return a hashable key for an indexed value."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("__json__", json.dumps(value, sort_keys=True, default=str))
+
+
+class View:
+    """Documents of a collection grouped by the value of their ``key`` field.
+
+    Views are maintained incrementally on every change of the collection,
+    :meth:`count` and :meth:`get` are dictionary lookups. A published view
+    is never modified, like the collection holding it.
+    """
+
+    def __init__(self, key: str, value: Optional[str] = None) -> None:
+        self.key = key
+        self.value = value
+        # key value -> ordered primary keys -> value field of the document
+        self.groups: Dict[Any, Dict[Any, Any]] = {}
+        # Groups shared with the view this one was cloned from are copied
+        # before their first change; None when every group is our own
+        self._owned: Optional[set] = None
+
+    def clone(self) -> "View":
+        view = View(self.key, self.value)
+        view.groups = dict(self.groups)
+        view._owned = set()
+        return view
+
+    def _group(self, key: Any) -> Dict[Any, Any]:
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {}
+        elif self._owned is not None and key not in self._owned:
+            group = self.groups[key] = dict(group)
+        else:
+            return group
+        if self._owned is not None:
+            self._owned.add(key)
+        return group
+
+    def add(self, pk: Any, doc: Dict[str, Any]) -> None:
+        value = doc.get(self.value) if self.value else None
+        self._group(_index_key(doc.get(self.key)))[pk] = value
+
+    def remove(self, pk: Any, doc: Dict[str, Any]) -> None:
+        key = _index_key(doc.get(self.key))
+        if key in self.groups:
+            group = self._group(key)
+            group.pop(pk, None)
+            if not group:
+                del self.groups[key]
+
+    def count(self, key: Any) -> int:
+        """Return the number of documents whose ``key`` field equals ``key``."""
+        return len(self.groups.get(_index_key(key), ()))
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the ``value`` field of the last document changed whose ``key``
+        field equals ``key``."""
+        group = self.groups.get(_index_key(key))
+        if not group:
+            return default
+        return next(reversed(group.values()))
+
+
+class _Collection:
+    """Documents of one collection keyed by primary key, plus hash indexes
+    and views.
+
+    ``positions`` gives the rank of each key in the collection order, the
+    order ``docs`` iterates in, so that the results of an index keep it.
+
+    ``rev`` is the revision of the last commit applied. ``revs`` and
+    ``tombstones`` map the keys of live and deleted documents to the
+    revision that last changed them, ordered by revision; deletions older
+    than ``horizon`` are forgotten.
+
+    Once published to readers a collection is never modified again, writers
+    modify a :meth:`clone` instead.
+    """
+
+    TOMBSTONE_LIMIT = 1000
+
+    def __init__(self, fields: Iterable[str] = (),
+                 views: Optional[Dict[str, tuple]] = None) -> None:
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.positions: Dict[Any, int] = {}
+        self._next_position = 0
+        # field -> indexed value -> ordered set of primary keys
+        self.indexes: Dict[str, Dict[Any, Dict[Any, None]]] = {}
+        self.views: Dict[str, View] = {}
+        self.rev = 0
+        self.horizon = 0
+        self.revs: Dict[Any, int] = {}
+        self.tombstones: Dict[Any, int] = {}
+        # (field, value) of the index buckets copied since the last clone, the
+        # others are shared with the original; None when all are our own
+        self._owned: Optional[set] = None
+        for field in fields:
+            self.add_index(field)
+        for name, (key, value) in (views or {}).items():
+            self.add_view(name, key, value)
+
+    def clone(self) -> "_Collection":
+        coll = _Collection()
+        coll.docs = dict(self.docs)
+        coll.positions = dict(self.positions)
+        coll._next_position = self._next_position
+        coll.indexes = {field: dict(index) for field, index in self.indexes.items()}
+        coll._owned = set()
+        coll.views = {name: view.clone() for name, view in self.views.items()}
+        coll.rev = self.rev
+        coll.horizon = self.horizon
+        coll.revs = dict(self.revs)
+        coll.tombstones = dict(self.tombstones)
+        return coll
+
+    def add_index(self, field: str) -> None:
+        if field == PRIMARY_KEY or field in self.indexes:
+            return
+        index = {}
+        for key, doc in self.docs.items():
+            index.setdefault(_index_key(doc.get(field)), {})[key] = None
+        self.indexes[field] = index
+
+    def add_view(self, name: str, key: str, value: Optional[str] = None) -> None:
+        view = View(key, value)
+        for pk, doc in self.docs.items():
+            view.add(pk, doc)
+        self.views[name] = view
+
+    def _bucket(self, field: str, value: Any) -> Dict[Any, None]:
+        """Return the index bucket of ``value`` for modification."""
+        index = self.indexes[field]
+        bucket = index.get(value)
+        if bucket is None:
+            bucket = index[value] = {}
+        elif self._owned is not None and (field, value) not in self._owned:
+            bucket = index[value] = dict(bucket)
+        else:
+            return bucket
+        if self._owned is not None:
+            self._owned.add((field, value))
+        return bucket
+
+    def _index(self, key: Any, doc: Dict[str, Any]) -> None:
+        for field in self.indexes:
+            self._bucket(field, _index_key(doc.get(field)))[key] = None
+        for view in self.views.values():
+            view.add(key, doc)
+
+    def _unindex(self, key: Any, doc: Dict[str, Any]) -> None:
+        for field, index in self.indexes.items():
+            value = _index_key(doc.get(field))
+            if value in index:
+                bucket = self._bucket(field, value)
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[value]
+        for view in self.views.values():
+            view.remove(key, doc)
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        key = doc[PRIMARY_KEY]
+        if key in self.docs:
+            raise ValueError(f"Duplicate {PRIMARY_KEY} '{key}'")
+        self.docs[key] = doc
+        self.positions[key] = self._next_position
+        self._next_position += 1
+        self._index(key, doc)
+        self.tombstones.pop(key, None)
+        self.revs[key] = doc.get(REVISION_KEY, 0)
+
+    def remove(self, key: Any, rev: int = 0) -> Dict[str, Any]:
+        doc = self.docs.pop(key)
+        del self.positions[key]
+        self._unindex(key, doc)
+        self.revs.pop(key, None)
+        self._bury(key, rev)
+        return doc
+
+    def _bury(self, key: Any, rev: int) -> None:
+        self.tombstones[key] = rev
+        if len(self.tombstones) > self.TOMBSTONE_LIMIT:
+            oldest = next(iter(self.tombstones))
+            self.horizon = max(self.horizon, self.tombstones.pop(oldest))
+
+    def replace(self, key: Any, doc: Dict[str, Any]) -> None:
+        new_key = doc[PRIMARY_KEY]
+        if new_key != key and new_key in self.docs:
+            raise ValueError(f"Duplicate {PRIMARY_KEY} '{new_key}'")
+        self._unindex(key, self.docs[key])
+        if new_key != key:
+            # Re-key in place so the collection order is preserved
+            self.docs = {new_key if k == key else k: v for k, v in self.docs.items()}
+            self.positions[new_key] = self.positions.pop(key)
+        self.docs[new_key] = doc
+        self._index(new_key, doc)
+        self.revs.pop(key, None)
+        self.revs[new_key] = doc.get(REVISION_KEY, 0)
+        if new_key != key:
+            self.tombstones.pop(new_key, None)
+            self._bury(key, doc.get(REVISION_KEY, 0))
+
+    def _lookup(self, field: str, condition: Any) -> Optional[Dict[Any, None]]:
+        """Return the keys of the documents whose ``field`` may satisfy
+        ``condition``, or None when no index can tell."""
+        if not _is_query(condition):
+            values = [condition]
+        elif "$eq" in condition:
+            values = [condition["$eq"]]
+        elif isinstance(condition.get("$in"), (list, tuple, set, frozenset)):
+            values = condition["$in"]
+        else:
+            return None
+
+        if field == PRIMARY_KEY:
+            keys = {}
+            for value in values:
+                try:
+                    if value in self.docs:
+                        keys[value] = None
+                except TypeError:
+                    pass
+            return keys
+        index = self.indexes.get(field)
+        if index is None:
+            return None
+        if len(values) == 1:
+            return index.get(_index_key(values[0]), {})
+        keys = {}
+        for value in values:
+            keys.update(index.get(_index_key(value), {}))
+        return keys
+
+    def candidates(self, filter_dict) -> Iterable[Dict[str, Any]]:
+        """Return a superset of the documents matching the filter.
+
+        The smallest set of keys the primary key or an index gives for an
+        equality or ``$in`` condition is used, falling back to the whole
+        collection when no such condition is on an indexed field.
+        """
+        if not filter_dict:
+            return self.docs.values()
+        best = None
+        for field, condition in filter_dict.items():
+            keys = self._lookup(field, condition)
+            if keys is not None and (best is None or len(keys) < len(best)):
+                best = keys
+                if not best:
+                    break
+        if best is None:
+            return self.docs.values()
+        # Index buckets are in the order of the last change to their documents
+        return [self.docs[key] for key in sorted(best, key=self.positions.__getitem__)]
+
+
+def _new_collection(name: str, documents: Iterable[Dict[str, Any]] = (),
+                    fields: Iterable[str] = (),
+                    views: Optional[Dict[str, tuple]] = None) -> _Collection:
+    coll = _Collection(fields, views)
+    for doc in documents:
+        if doc.get(PRIMARY_KEY) is None or doc[PRIMARY_KEY] in coll.docs:
+            new_key = str(uuid.uuid4())
+            LOG.warning(f"Document in '{name}' has a missing or duplicate "
+                        f"{PRIMARY_KEY} '{doc.get(PRIMARY_KEY)}', assigned '{new_key}'")
+            doc[PRIMARY_KEY] = new_key
+        coll.add(doc)
+    # Stored documents come in collection order, the revisions must be sorted
+    coll.revs = dict(sorted(coll.revs.items(), key=lambda item: item[1]))
+    return coll
+
+
+def _valid_name(collection: Any) -> bool:
+    return (isinstance(collection, str) and bool(_COLLECTION_NAME.match(collection)) and
+            collection not in _RESERVED_NAMES)
+
+
+def check_collection_name(collection: Any) -> None:
+    """Raise ValueError unless ``collection`` can name a collection."""
+    if not _valid_name(collection):
+        raise ValueError(f"Invalid collection name '{collection}'")
+
+
+def check_documents(collection: str, documents: Iterable[Any]) -> None:
+    """Raise ValueError unless ``documents`` can replace ``collection`` as is."""
+    keys = set()
+    for doc in documents:
+        if not isinstance(doc, dict):
+            raise ValueError(f"Document of '{collection}' is not an object")
+        if PRIMARY_KEY not in doc:
+            raise ValueError(f"Document without '{PRIMARY_KEY}' in '{collection}'")
+        if doc[PRIMARY_KEY] in keys:
+            raise ValueError(f"Duplicate document '{doc[PRIMARY_KEY]}' in '{collection}'")
+        keys.add(doc[PRIMARY_KEY])
+
+
+def _apply(coll: _Collection, op: Dict[str, Any], rev: int) -> None:
+    if op["op"] == "insert":
+        coll.add(op["doc"])
+    elif op["op"] == "update":
+        coll.replace(op["id"], {**coll.docs[op["id"]], **op["set"]})
+    elif op["op"] == "delete":
+        coll.remove(op["id"], rev)
+    else:
+        raise ValueError(f"Unknown log operation '{op['op']}'")
+
+
+def _read_legacy(engine: str, path: str) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+    """Return the documents of a single file database and its sequence."""
+    data, seq, entries = open_storage(engine, path).load()
+    colls = {name: _new_collection(name, docs) for name, docs in data.items()}
+    for entry in entries:
+        if entry["seq"] <= seq:
+            continue
+        for op in entry["ops"]:
+            try:
+                _apply(colls.setdefault(op["c"], _Collection()), op, entry["seq"])
+            except (KeyError, ValueError) as e:
+                LOG.error(f"Failed to replay log entry {entry['seq']} of {path}: {e}")
+        seq = entry["seq"]
+    return {name: list(coll.docs.values()) for name, coll in colls.items()}, seq
+
+
+class _Ticket:
+    """Durability acknowledgement of one queued log entry."""
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = False
+        self.error = None
+
+
+class _Shard:
+    """One collection with its own storage, locks, log sequence and writers.
+
+    ``coll`` is the published state of the collection, it is never modified:
+    each commit publishes a modified clone. The storage lock is held by a
+    write session from before the state is read until the queued entries are
+    flushed, so the entries this process appends are always based on
+    everything other processes wrote before.
+    """
+
+    def __init__(self, db: "JSONDocumentDB", name: str, storage: Storage) -> None:
+        self.db = db
+        self.name = name
+        self.storage = storage
+        self.lock = threading.Lock()
+        self._flush_cond = threading.Condition(self.lock)
+        self.coll: Optional[_Collection] = None
+        self._seq = 0
+        self._write_session = False
+        self._pending: List[tuple] = []
+        self._flushing = False
+        # Writers of this process waiting for self.lock to commit
+        self._arriving = 0
+        self._arriving_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compacting = False
+
+    def snapshot(self) -> _Collection:
+        """Return the published state for reading, without waiting on writers.
+
+        When a writer of this process holds ``self.lock`` the published state
+        is served as is, the writer catches up with other processes before
+        writing anyway.
+        """
+        coll = self.coll
+        if coll is None:
+            with self.lock:
+                return self._load()
+        if self._write_session or not self.storage.changed():
+            return coll
+        if not self.lock.acquire(blocking=False):
+            return coll
+        try:
+            return self._load()
+        finally:
+            self.lock.release()
+
+    def _load(self) -> _Collection:
+        if self.coll is None:
+            self._reload()
+        elif not self._write_session:
+            # While this process holds a write session nobody else can write
+            self._refresh()
+        return self.coll
+
+    def _reload(self) -> None:
+        if self.storage.empty():
+            self._migrate()
+        data, self._seq, entries = self.storage.load()
+        coll = _new_collection(self.name, data.get(self.name, ()),
+                               self.db._index_fields.get(self.name, ()),
+                               self.db._views.get(self.name))
+        # Deletions folded into the stored state are unknown
+        coll.rev = coll.horizon = self._seq
+        self.coll = self._replay(coll, entries)
+        self._maybe_compact()
+
+    def _migrate(self) -> None:
+        """Import the collection from a single file database into an empty storage."""
+        for engine, path in LEGACY_DB_PATHS:
+            if path == self.storage.path or not os.path.exists(path):
+                continue
+            with self.storage.lock:
+                if not self.storage.empty():
+                    return
+                data, seq = _read_legacy(engine, path)
+                docs = data.get(self.name, [])
+                self.storage.import_documents({self.name: docs} if docs else {}, seq)
+            LOG.info(f"Imported {len(docs)} documents of '{self.name}' from {path}")
+            return
+
+    def _refresh(self) -> None:
+        """Catch up with the changes other processes made since the last look."""
+        entries = self.storage.poll()
+        if entries is None:
+            # Compacted or restored by another process
+            self._reload()
+        else:
+            self.coll = self._replay(self.coll, entries)
+
+    def _replay(self, coll: _Collection, entries: List[Dict[str, Any]]) -> _Collection:
+        # Entries up to the snapshot sequence were already folded into it
+        entries = [entry for entry in entries if entry["seq"] > self._seq]
+        if not entries:
+            return coll
+        coll = coll.clone()
+        for entry in entries:
+            for op in entry["ops"]:
+                try:
+                    _apply(coll, op, entry["seq"])
+                except (KeyError, ValueError) as e:
+                    LOG.error(f"Failed to replay log entry {entry['seq']} "
+                              f"of '{self.name}': {e}")
+            self._seq = coll.rev = entry["seq"]
+        return coll
+
+    @contextlib.contextmanager
+    def writing(self):
+        """Hold ``self.lock`` and a write session, yielding the current state."""
+        started = False
+        with self._arriving_lock:
+            self._arriving += 1
+        try:
+            self.lock.acquire()
+            if not self._write_session:
+                # Readers loading the collection take self.lock, the writers of
+                # other processes are waited for without it
+                self.lock.release()
+                self.storage.lock.acquire()
+                self.lock.acquire()
+                if self._write_session:
+                    # Started by another thread meanwhile, the lock is shared
+                    self.storage.lock.release()
+                else:
+                    self._write_session = started = True
+        finally:
+            with self._arriving_lock:
+                self._arriving -= 1
+        try:
+            try:
+                if started and self.coll is not None:
+                    self._refresh()
+                yield self._load()
+            finally:
+                self._end_write_session()
+        finally:
+            self.lock.release()
+
+    def _end_write_session(self) -> None:
+        if self._write_session and not self._pending and not self._flushing:
+            self._write_session = False
+            self.storage.lock.release()
+
+    def commit(self, coll: _Collection, ops: List[Dict[str, Any]]) -> None:
+        """Publish ``ops`` applied to ``coll`` and wait until they are on disk.
+
+        The operations are applied to a clone which replaces the published
+        state only once they all succeeded. Must be called within
+        :meth:`writing`.
+        """
+        if not ops:
+            return
+        rev = self._seq + 1
+        for op in ops:
+            if op["op"] == "insert":
+                op["doc"][REVISION_KEY] = rev
+            elif op["op"] == "update":
+                op["set"] = {**op["set"], REVISION_KEY: rev}
+        coll = coll.clone()
+        for op in ops:
+            _apply(coll, op, rev)
+        coll.rev = self._seq = rev
+        self.coll = coll
+        ticket = _Ticket()
+        self._pending.append(({"seq": self._seq, "ops": ops}, ticket))
+        if self._flushing and not self._arriving:
+            # The last writer the flush leader is waiting for
+            self._flush_cond.notify_all()
+        self._wait_durable(ticket)
+        self._maybe_compact()
+
+    def _wait_durable(self, ticket: _Ticket) -> None:
+        """Block until the entry of ``ticket`` is flushed, flushing it if needed.
+
+        The first waiter becomes the flush leader: while other writers are
+        waiting for ``self.lock``, it gives them up to the group commit window
+        to queue their entries, then writes every queued entry with
+        ``self.lock`` released. A lone writer flushes at once. Other waiters
+        sleep until a leader acknowledges their entry.
+        """
+        while not ticket.done:
+            if self._flushing:
+                self._flush_cond.wait()
+                continue
+            self._flushing = True
+            try:
+                deadline = time.monotonic() + self.db.GROUP_COMMIT_WINDOW
+                while self._arriving:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._flush_cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                error = None
+                self.lock.release()
+                try:
+                    # The write session already holds the storage lock
+                    self.storage.append([entry for entry, _ in batch])
+                except Exception as e:
+                    LOG.error(f"Failed to write {len(batch)} log entries "
+                              f"of '{self.name}': {e}")
+                    error = e
+                finally:
+                    self.lock.acquire()
+                if error is not None:
+                    # Entries queued behind the failed batch were applied on top
+                    # of it, fail them too and reload the state from the disk
+                    batch += self._pending
+                    self._pending = []
+                    self.coll = None
+                for _, waiter in batch:
+                    waiter.done = True
+                    waiter.error = error
+            finally:
+                self._flushing = False
+                self._flush_cond.notify_all()
+                self._end_write_session()
+        if ticket.error is not None:
+            raise ticket.error
+
+    def _wait_all_durable(self) -> None:
+        while self._pending or self._flushing:
+            if self._pending:
+                self._wait_durable(self._pending[-1][1])
+            else:
+                self._flush_cond.wait()
+
+    def _maybe_compact(self) -> None:
+        if self._compacting or not self.storage.should_compact():
+            return
+        self._compacting = True
+        threading.Thread(target=self._compact_in_background,
+                         name=f"json-db-compact-{self.name}", daemon=True).start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            LOG.error(f"Failed to compact {self.storage.path}: {e}")
+        finally:
+            self._compacting = False
+
+    def compact(self) -> None:
+        """Let the storage drop the log entries it no longer needs.
+
+        Only the copy of the document list is taken under the lock, the
+        storage does the slow part while writers keep appending.
+        """
+        with self._compact_lock:
+            with self.lock:
+                self._wait_all_durable()
+                coll = self._load()
+                data = {self.name: list(coll.docs.values())} if self.storage.snapshots else None
+                checkpoint = self.storage.checkpoint(self._seq)
+            self.storage.compact(data, checkpoint)
+
+    def durable(self) -> _Collection:
+        """Return the current state once every write of this process is on disk.
+
+        The caller holds ``self.lock``.
+        """
+        self._wait_all_durable()
+        return self._load()
+
+    def restore(self, documents: List[Dict[str, Any]]) -> int:
+        """Replace every document in a single storage step, returning the new
+        revision.
+
+        The documents are stamped with the new revision, the ones they had
+        in the backed up database mean nothing in this one.
+        """
+        with self.lock:
+            self._wait_all_durable()
+            with self.storage.lock:
+                # Catch up first, the revision must follow every stored one
+                self._load()
+                rev = self._seq + 1
+                documents = [{**doc, REVISION_KEY: rev} for doc in documents]
+                coll = _new_collection(self.name, documents,
+                                       self.db._index_fields.get(self.name, ()),
+                                       self.db._views.get(self.name))
+                self.storage.restore({self.name: documents} if documents else {}, rev)
+                # The change feed of earlier revisions is lost
+                coll.rev = coll.horizon = self._seq = rev
+                self.coll = coll
+        LOG.info(f"Restored {len(documents)} documents of '{self.name}' at revision {rev}")
+        return rev
+
+    def add_index(self, field: str) -> None:
+        with self.lock:
+            if self.coll is not None:
+                coll = self.coll.clone()
+                coll.add_index(field)
+                self.coll = coll
+        self.storage.create_index(self.name, field)
+
+    def add_view(self, name: str, key: str, value: Optional[str]) -> None:
+        with self.lock:
+            if self.coll is not None:
+                coll = self.coll.clone()
+                coll.add_view(name, key, value)
+                self.coll = coll
+
+    def clear_cache(self) -> None:
+        with self.lock:
+            self._wait_all_durable()
+            self.coll = None
 
 
 class JSONDocumentDB:
-    """A lightweight JSON document database with thread-safe operations."""
+    """A lightweight JSON document database with thread-safe operations.
+
+    Documents are keyed by their ``id`` field. Secondary hash indexes can be
+    declared per collection with :meth:`create_index`; ``find`` and friends use
+    them automatically whenever the filter covers an indexed field. Returned
+    documents are copies, mutating them does not touch the database.
+    Derived views, such as document counts per field value, are declared
+    with :meth:`create_view` and maintained on every change.
+
+    Each collection is stored in its own file of ``DB_DIR`` with its own
+    locks, so writes to different collections do not wait on each other.
+    Every mutation becomes a log entry handed to the storage engine selected
+    by ``BRAIN_DB_ENGINE``: ``json`` keeps a snapshot file plus a write-ahead
+    log, ``sqlite`` keeps one row per document in a SQLite database. An
+    empty collection imports its documents once from the single file
+    databases of ``LEGACY_DB_PATHS``. Storage housekeeping, such as folding
+    the log into a snapshot, runs in the background.
+
+    Log writes use group commit: entries queued while a previous flush is
+    running, or by concurrent writers within ``GROUP_COMMIT_WINDOW`` seconds,
+    go to disk with a single write and fsync. A writer with no other writer
+    waiting flushes at once. A mutating call returns only after
+    the flush carrying its entry succeeded.
+
+    Readers never take a lock in the common case: each commit publishes a
+    modified copy of the collection it touched.
+
+    Every commit bumps the revision of its collection and stores it in the
+    ``_rev`` field of the documents it inserted or updated;
+    :meth:`changes` returns what changed after a given revision, and
+    :meth:`update_one` can be made conditional on the ``_rev`` read before.
+
+    Several processes can share the database. Writers hold the storage lock
+    of the collection from before they read its state until their entries
+    are flushed, and every access first polls the storage, replaying only
+    the log entries other processes committed since the last look.
+    """
     _instance = None
     _instance_lock = threading.Lock()
 
+    GROUP_COMMIT_WINDOW = 0.002
+
     def __new__(cls):
         with cls._instance_lock:
             if cls._instance is None:
@@ -21,47 +810,184 @@ class JSONDocumentDB:
     def __init__(self) -> None:
         if self._initialized:
             return
-        self.file_path: str = "/opt/brain/db.json"
-        self.lock = threading.Lock()
-        self.file_lock: FileLock = FileLock(f"{self.file_path}.lock")
-        self._ensure_file_exists()
-        self._cache = None
+        self.db_dir: str = DB_DIR
+        self._shards: Dict[str, _Shard] = {}
+        self._shards_lock = threading.Lock()
+        self._index_fields: Dict[str, List[str]] = {}
+        # collection -> view name -> (key field, value field)
+        self._views: Dict[str, Dict[str, tuple]] = {}
         self._initialized: bool = True
 
-    def _ensure_file_exists(self) -> None:
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, "w") as f:
-                json.dump({}, f)
-
-    def _load_db(self) -> Dict[str, List[Dict[str, Any]]]:
-        if self._cache is not None:
-            return self._cache
-        with self.file_lock:
-            self._ensure_file_exists()
-            with open(self.file_path, "r") as f:
-                self._cache = json.load(f)
-        return self._cache
-
-    def _save_db(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
-        with self.file_lock:
-            self._ensure_file_exists()
-            with open(self.file_path, "w") as f:
-                json.dump(data, f, indent=2)
-        self._cache = data
+    def _shard(self, collection: str) -> _Shard:
+        shard = self._shards.get(collection)
+        if shard is not None:
+            return shard
+        check_collection_name(collection)
+        with self._shards_lock:
+            shard = self._shards.get(collection)
+            if shard is None:
+                path = os.path.join(self.db_dir, collection + DB_SUFFIXES[DB_ENGINE])
+                shard = _Shard(self, collection, open_storage(DB_ENGINE, path))
+                self._shards[collection] = shard
+            return shard
+
+    def collections(self) -> List[str]:
+        """Return the names of the collections stored in ``db_dir`` or opened."""
+        stored = ENGINES[DB_ENGINE].stored_collections(self.db_dir, DB_SUFFIXES[DB_ENGINE])
+        names = set(self._shards)
+        names.update(name for name in stored if _valid_name(name))
+        return sorted(names)
+
+    def export(self, collections: Optional[Iterable[str]] = None
+               ) -> Dict[str, Tuple[int, List[Dict[str, Any]]]]:
+        """Return the revision and documents of ``collections``, all by default.
+
+        The durable state of every collection is captured at the same point
+        in time: writers of this process wait only until the published states
+        are caught up, not while the caller goes through the documents. The
+        documents are shared with the database and must not be modified.
+        """
+        names = sorted(set(collections if collections is not None else self.collections()))
+        shards = [self._shard(name) for name in names]
+        with contextlib.ExitStack() as stack:
+            colls = []
+            for shard in shards:
+                stack.enter_context(shard.lock)
+                colls.append(shard.durable())
+        return {name: (coll.rev, list(coll.docs.values())) for name, coll in zip(names, colls)}
+
+    def restore(self, collection: str, documents: Iterable[Dict[str, Any]]) -> int:
+        """Replace every document of ``collection`` with ``documents``.
+
+        The storage writes the new content in one step instead of logging
+        each document; other processes reload the collection and change
+        feeds report a reset. Return the new revision of the collection,
+        which every restored document carries.
+        """
+        documents = list(documents)
+        check_documents(collection, documents)
+        return self._shard(collection).restore(documents)
+
+    def _matching(self, coll: _Collection, filter_dict) -> List[Dict[str, Any]]:
+        return [doc for doc in coll.candidates(filter_dict) if self._match(doc, filter_dict)]
+
+    def create_index(self, collection: str, field: str) -> None:
+        """Declare a hash index on ``field`` of ``collection``.
+
+        Declaring the same index more than once is harmless.
+        """
+        fields = self._index_fields.setdefault(collection, [])
+        if field not in fields:
+            fields.append(field)
+        self._shard(collection).add_index(field)
+
+    def create_view(self, collection: str, name: str, key: str,
+                    value: Optional[str] = None) -> None:
+        """Declare a view of ``collection`` grouping its documents by ``key``.
+
+        The view counts the documents per ``key`` value and, with ``value``,
+        maps each ``key`` value to that field, e.g. a server id to the id of
+        the bare metal it belongs to. Declaring the same view again is
+        harmless.
+        """
+        views = self._views.setdefault(collection, {})
+        if views.get(name) == (key, value):
+            return
+        views[name] = (key, value)
+        self._shard(collection).add_view(name, key, value)
+
+    def view(self, collection: str, name: str) -> View:
+        """Return the current state of a view declared with :meth:`create_view`."""
+        view = self._shard(collection).snapshot().views.get(name)
+        if view is None:
+            raise ValueError(f"No view '{name}' on '{collection}'")
+        return view
 
     def insert(self, collection: str, document: Dict[str, Any]) -> None:
-        with self.lock:
-            db = self._load_db()
-            if collection not in db:
-                db[collection] = []
-            db[collection].append(document)
-            self._save_db(db)
+        """Insert a document, an ``id`` is assigned when it has none."""
+        if document.get(PRIMARY_KEY) is None:
+            document[PRIMARY_KEY] = str(uuid.uuid4())
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            if document[PRIMARY_KEY] in coll.docs:
+                raise ValueError(f"Duplicate {PRIMARY_KEY} '{document[PRIMARY_KEY]}' "
+                                 f"in '{collection}'")
+            shard.commit(coll, [{"op": "insert", "c": collection, "doc": dict(document)}])
 
-    def find(self, collection: str, filter_dict=None) -> List[Dict[str, Any]]:
-        with self.lock:
-            db = self._load_db()
-            return [doc for doc in db.get(collection, []) if self._match(doc, filter_dict)]
+    def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        """Insert documents as a single commit, all of them or none.
+
+        Documents without an ``id`` are given one once the batch is committed.
+        """
+        docs = [dict(document) for document in documents]
+        for doc in docs:
+            if doc.get(PRIMARY_KEY) is None:
+                doc[PRIMARY_KEY] = str(uuid.uuid4())
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            seen = set()
+            for doc in docs:
+                key = doc[PRIMARY_KEY]
+                if key in coll.docs or key in seen:
+                    raise ValueError(f"Duplicate {PRIMARY_KEY} '{key}' in '{collection}'")
+                seen.add(key)
+            shard.commit(coll, [{"op": "insert", "c": collection, "doc": doc} for doc in docs])
+        for document, doc in zip(documents, docs):
+            document[PRIMARY_KEY] = doc[PRIMARY_KEY]
+
+    def find(self, collection: str, filter_dict=None,
+             projection: Optional[Iterable[str]] = None, sort: Optional[Sort] = None,
+             limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Find the documents of the collection matching the filter.
+
+        A filter value is compared for equality unless it is an operator
+        document such as ``{"$gte": 10, "$lt": 100}``, see ``_OPERATORS``.
+        ``sort`` is a field name, prefixed with ``-`` for descending order, or
+        a list of ``(field, 1 or -1)`` pairs. ``projection`` lists the fields
+        to return besides ``id``. Without ``sort`` the scan stops as soon as
+        ``offset + limit`` documents matched.
+        """
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit and offset must not be negative")
+        coll = self._shard(collection).snapshot()
+        docs = (doc for doc in coll.candidates(filter_dict) if self._match(doc, filter_dict))
+        if sort:
+            docs = _sorted(docs, sort)
+        if offset or limit is not None:
+            docs = itertools.islice(docs, offset, None if limit is None else offset + limit)
+        return [_project(doc, projection) for doc in docs]
+
+    def revision(self, collection: str) -> int:
+        """Return the revision of the last commit to the collection."""
+        return self._shard(collection).snapshot().rev
+
+    def changes(self, collection: str, since: int = 0) -> Dict[str, Any]:
+        """Return what changed in the collection after revision ``since``.
+
+        The result holds the current ``rev``, the inserted or updated
+        ``documents`` and the primary keys of the ``deleted`` ones. When
+        deletions that old are no longer known ``reset`` is set and
+        ``documents`` holds the whole collection instead.
+        """
+        coll = self._shard(collection).snapshot()
+        if since >= coll.rev:
+            return {"rev": coll.rev, "reset": False, "documents": [], "deleted": []}
+        if since < coll.horizon:
+            return {"rev": coll.rev, "reset": True,
+                    "documents": [dict(doc) for doc in coll.docs.values()], "deleted": []}
+
+        documents = []
+        for key in reversed(coll.revs):
+            if coll.revs[key] <= since:
+                break
+            documents.append(dict(coll.docs[key]))
+        deleted = []
+        for key in reversed(coll.tombstones):
+            if coll.tombstones[key] <= since:
+                break
+            deleted.append(key)
+        return {"rev": coll.rev, "reset": False,
+                "documents": documents[::-1], "deleted": deleted[::-1]}
 
     def find_one(self, collection: str, filter_dict=None) -> Dict[str, Any]:
         """Find a single document in the collection matching the filter."""
@@ -75,23 +1001,24 @@ class JSONDocumentDB:
 
     def update(self, collection: str, filter_dict: Dict[str, Any],
                update_dict: Dict[str, Any]) -> int:
-        with self.lock:
-            db = self._load_db()
-            updated = 0
-            for doc in db.get(collection, []):
-                if self._match(doc, filter_dict):
-                    doc.update(update_dict)
-                    updated += 1
-            if updated > 0:
-                self._save_db(db)
-            return updated
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            matched_docs = self._matching(coll, filter_dict)
+            shard.commit(coll, [{"op": "update", "c": collection, "id": doc[PRIMARY_KEY],
+                                 "set": update_dict} for doc in matched_docs])
+            return len(matched_docs)
 
     def update_one(self, collection: str, filter_dict: Dict[str, Any],
-                   update_dict: Dict[str, Any]) -> Dict[str, Any]:
-        """Update the first matching document in the collection."""
-        with self.lock:
-            db = self._load_db()
-            matched_docs = [doc for doc in db.get(collection, []) if self._match(doc, filter_dict)]
+                   update_dict: Dict[str, Any],
+                   expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Update the first matching document in the collection.
+
+        With ``expected_version`` the update only happens while the ``_rev``
+        of the document still equals it, ConflictError is raised otherwise.
+        """
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            matched_docs = self._matching(coll, filter_dict)
 
             if not matched_docs:
                 raise ValueError(f"No document found in '{collection}' matching {filter_dict}")
@@ -100,28 +1027,53 @@ class JSONDocumentDB:
                 raise ValueError(
                     f"Expected 1 document, but found {len(matched_docs)} in '{collection}'")
 
-            original_doc = matched_docs[0].copy()
-            matched_docs[0].update(update_dict)
-            self._save_db(db)
+            original_doc = matched_docs[0]
+            version = original_doc.get(REVISION_KEY, 0)
+            if expected_version is not None and version != expected_version:
+                raise ConflictError(
+                    f"Document '{original_doc[PRIMARY_KEY]}' in '{collection}' is at "
+                    f"version {version}, expected {expected_version}")
+            shard.commit(coll, [{"op": "update", "c": collection,
+                                 "id": original_doc[PRIMARY_KEY], "set": update_dict}])
+
+            return dict(original_doc)
 
-            return original_doc
+    def update_many(self, collection: str, patches: Dict[Any, Dict[str, Any]]) -> int:
+        """Apply a patch per primary key as a single commit, all of them or none."""
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            missing = [key for key in patches if key not in coll.docs]
+            if missing:
+                raise ValueError(f"No document found in '{collection}' with "
+                                 f"{PRIMARY_KEY} {', '.join(map(str, missing))}")
+            shard.commit(coll, [{"op": "update", "c": collection, "id": key, "set": patch}
+                                for key, patch in patches.items()])
+            return len(patches)
 
     def delete(self, collection: str, filter_dict: Dict[str, Any]) -> int:
-        with self.lock:
-            db = self._load_db()
-            original_len = len(db.get(collection, []))
-            db[collection] = [doc for doc in db.get(
-                collection, []) if not self._match(doc, filter_dict)]
-            deleted = original_len - len(db[collection])
-            if deleted > 0:
-                self._save_db(db)
-            return deleted
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            matched_docs = self._matching(coll, filter_dict)
+            shard.commit(coll, [{"op": "delete", "c": collection, "id": doc[PRIMARY_KEY]}
+                                for doc in matched_docs])
+            return len(matched_docs)
+
+    def delete_many(self, collection: str, ids: Iterable[Any]) -> int:
+        """Delete the documents with the given primary keys as a single commit.
+
+        Unknown keys are ignored, the number of deleted documents is returned.
+        """
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            keys = [key for key in dict.fromkeys(ids) if key in coll.docs]
+            shard.commit(coll, [{"op": "delete", "c": collection, "id": key} for key in keys])
+            return len(keys)
 
     def delete_one(self, collection: str, filter_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Delete the first matching document in the collection."""
-        with self.lock:
-            db = self._load_db()
-            matched_docs = [doc for doc in db.get(collection, []) if self._match(doc, filter_dict)]
+        shard = self._shard(collection)
+        with shard.writing() as coll:
+            matched_docs = self._matching(coll, filter_dict)
 
             if not matched_docs:
                 raise ValueError(f"No document found in '{collection}' matching {filter_dict}")
@@ -130,19 +1082,117 @@ class JSONDocumentDB:
                     f"Expected 1 document, but found {len(matched_docs)} in '{collection}'")
 
             deleted_doc = matched_docs[0]
-            db[collection] = [doc for doc in db.get(collection, []) if doc != deleted_doc]
-            self._save_db(db)
+            shard.commit(coll, [{"op": "delete", "c": collection, "id": deleted_doc[PRIMARY_KEY]}])
 
             return deleted_doc
 
     def _match(self, document: Dict[str, Any], filter_dict) -> bool:
         if not filter_dict:
             return True
-        for key, value in filter_dict.items():
-            if document.get(key) != value:
+        for key, condition in filter_dict.items():
+            value = document.get(key)
+            if _is_query(condition):
+                if not all(_test(value, op, operand) for op, operand in condition.items()):
+                    return False
+            elif value != condition:
                 return False
         return True
 
+    def compact(self) -> None:
+        """Compact the storage of every collection opened so far."""
+        for shard in list(self._shards.values()):
+            shard.compact()
+
     def clear_cache(self) -> None:
-        with self.lock:
-            self._cache = None
+        for shard in list(self._shards.values()):
+            shard.clear_cache()
+
+
+class AsyncJSONDocumentDB:
+    """Awaitable facade of JSONDocumentDB for async route handlers.
+
+    Mutations run on a small pool of writer threads: waiting for the locks
+    of other processes and for the flush to disk no longer blocks the event
+    loop, and concurrent writers still share flushes through group commit.
+    Reads are served synchronously from the in-memory state, they never
+    wait for writers, of this process or of others.
+    """
+    WRITER_THREADS = 4
+
+    _writers = None
+    _writers_lock = threading.Lock()
+
+    def __init__(self, db: Optional[JSONDocumentDB] = None) -> None:
+        self.db = db or JSONDocumentDB()
+
+    @classmethod
+    def _executor(cls) -> ThreadPoolExecutor:
+        with cls._writers_lock:
+            if cls._writers is None:
+                cls._writers = ThreadPoolExecutor(max_workers=cls.WRITER_THREADS,
+                                                  thread_name_prefix="json-db-writer")
+            return cls._writers
+
+    async def _write(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), functools.partial(method, *args))
+
+    def create_index(self, collection: str, field: str) -> None:
+        self.db.create_index(collection, field)
+
+    def create_view(self, collection: str, name: str, key: str,
+                    value: Optional[str] = None) -> None:
+        self.db.create_view(collection, name, key, value)
+
+    def view(self, collection: str, name: str) -> View:
+        return self.db.view(collection, name)
+
+    def collections(self) -> List[str]:
+        return self.db.collections()
+
+    async def export(self, collections: Optional[Iterable[str]] = None
+                     ) -> Dict[str, Tuple[int, List[Dict[str, Any]]]]:
+        return await self._write(self.db.export, collections)
+
+    async def restore(self, collection: str, documents: Iterable[Dict[str, Any]]) -> int:
+        return await self._write(self.db.restore, collection, documents)
+
+    def find(self, collection: str, filter_dict=None, **kwargs) -> List[Dict[str, Any]]:
+        return self.db.find(collection, filter_dict, **kwargs)
+
+    def find_one(self, collection: str, filter_dict=None) -> Dict[str, Any]:
+        return self.db.find_one(collection, filter_dict)
+
+    def revision(self, collection: str) -> int:
+        return self.db.revision(collection)
+
+    def changes(self, collection: str, since: int = 0) -> Dict[str, Any]:
+        return self.db.changes(collection, since)
+
+    async def insert(self, collection: str, document: Dict[str, Any]) -> None:
+        return await self._write(self.db.insert, collection, document)
+
+    async def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        return await self._write(self.db.insert_many, collection, documents)
+
+    async def update(self, collection: str, filter_dict: Dict[str, Any],
+                     update_dict: Dict[str, Any]) -> int:
+        return await self._write(self.db.update, collection, filter_dict, update_dict)
+
+    async def update_one(self, collection: str, filter_dict: Dict[str, Any],
+                         update_dict: Dict[str, Any],
+                         expected_version: Optional[int] = None) -> Dict[str, Any]:
+        return await self._write(self.db.update_one, collection, filter_dict, update_dict,
+                                 expected_version)
+
+    async def update_many(self, collection: str, patches: Dict[Any, Dict[str, Any]]) -> int:
+        return await self._write(self.db.update_many, collection, patches)
+
+    async def delete(self, collection: str, filter_dict: Dict[str, Any]) -> int:
+        return await self._write(self.db.delete, collection, filter_dict)
+
+    async def delete_one(self, collection: str, filter_dict: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._write(self.db.delete_one, collection, filter_dict)
+
+    async def delete_many(self, collection: str, ids: Iterable[Any]) -> int:
+        return await self._write(self.db.delete_many, collection, ids)
@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from brain import app
+from brain import exceptions
 from brain.api.register import register_routers
 from brain import middleware  # noqa: F401
 from brain.middleware import RequestIdLogFilter, RequestIdMiddleware
@@ -29,6 +30,17 @@ async def handle_500_exception(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(exceptions.BrainException)
+async def handle_brain_exception(request: Request, exc: exceptions.BrainException):
+    return JSONResponse(
+        status_code=exc.code,
+        content={
+            "detail": exc.msg
+        },
+        headers=exc.headers or None,
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(req: Request, exc: RequestValidationError):
     logger.error(f"422 Unprocessable Entity: {exc.errors()}, Request body: {exc.body}")
@@ -0,0 +1,20 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+from brain.storage.base import Storage # noqa
+from brain.storage.json_file import JsonFileStorage # noqa
+from brain.storage.sqlite import SQLiteStorage # noqa
+
+ENGINES = {
+    "json": JsonFileStorage,
+    "sqlite": SQLiteStorage,
+}
+
+
+def open_storage(engine: str, path: str) -> Storage:
+    """Instantiate the storage engine registered under ``engine``."""
+    try:
+        return ENGINES[engine](path)
+    except KeyError:
+        raise ValueError(f"Unknown storage engine '{engine}', "
+                         f"expected one of {', '.join(ENGINES)}")
@@ -0,0 +1,100 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from filelock import FileLock
+
+# Every document is keyed by this field, it acts as the unique primary index
+PRIMARY_KEY = "id"
+
+Documents = Dict[str, List[Dict[str, Any]]]
+Entry = Dict[str, Any]
+
+
+class Storage:
+    """Persistence engine behind JSONDocumentDB.
+
+    The database keeps every document in memory and hands the engine log
+    entries ``{"seq": n, "ops": [...]}`` where an op is one of::
+
+        {"op": "insert", "c": collection, "doc": {...}}
+        {"op": "update", "c": collection, "id": key, "set": {...}}
+        {"op": "delete", "c": collection, "id": key}
+
+    ``lock`` is the cross-process lock writers hold while they append. It is
+    not thread local, engines must not rely on it to exclude threads of the
+    same process.
+    """
+
+    # Whether compaction needs a copy of the documents
+    snapshots = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = FileLock(f"{path}.lock", thread_local=False)
+
+    @classmethod
+    def stored_collections(cls, directory: str, suffix: str) -> List[str]:
+        """Return the names of the collections written to ``directory``.
+
+        The storage of collection ``name`` is opened at
+        ``<directory>/<name><suffix>``.
+        """
+        raise NotImplementedError
+
+    def empty(self) -> bool:
+        """Return True when the storage was never written to."""
+        return False
+
+    def load(self) -> Tuple[Documents, int, List[Entry]]:
+        """Return the stored documents, their sequence and entries to replay."""
+        raise NotImplementedError
+
+    def changed(self) -> bool:
+        """Cheaply tell whether ``poll`` may return something.
+
+        Called by readers without any lock, it must not wait on I/O of this
+        process. False positives are fine.
+        """
+        return True
+
+    def poll(self) -> Optional[List[Entry]]:
+        """Return entries other processes committed since the last load or poll.
+
+        ``None`` means the storage changed in a way that requires a reload.
+        """
+        raise NotImplementedError
+
+    def append(self, entries: List[Entry]) -> None:
+        """Durably store ``entries``, the caller holds ``lock``."""
+        raise NotImplementedError
+
+    def import_documents(self, data: Documents, seq: int) -> None:
+        """Store ``data`` as the whole content of an empty storage."""
+        raise NotImplementedError
+
+    def restore(self, data: Documents, seq: int) -> None:
+        """Replace the whole content with ``data`` as of ``seq``.
+
+        The caller holds ``lock``. Other processes must get ``None`` from their
+        next ``poll`` so that they reload.
+        """
+        raise NotImplementedError
+
+    def create_index(self, collection: str, field: str) -> None:
+        """Mirror an index declared on the database, if the engine can."""
+
+    def should_compact(self) -> bool:
+        return False
+
+    def checkpoint(self, seq: int) -> Any:
+        """Remember the position of ``seq``, called while nothing is pending."""
+        return seq
+
+    def compact(self, data: Optional[Documents], checkpoint: Any) -> None:
+        """Drop what is no longer needed up to ``checkpoint``.
+
+        ``data`` holds the documents as of the checkpoint when ``snapshots``
+        is set, ``None`` otherwise.
+        """
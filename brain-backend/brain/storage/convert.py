@@ -0,0 +1,70 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Rewrite JSONDocumentDB snapshot files in another format.
+
+Usage: python -m brain.storage.convert --format msgpack [PATH ...]
+
+PATH is a snapshot file or a directory of them, the database directory by
+default. Files are replaced atomically under the storage lock, so the
+service may keep running: its processes reload the converted snapshots.
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+from brain.storage.json_file import (FORMATS, JsonFileStorage, _fsync_dir,
+                                     decode_snapshot, encode_snapshot)
+
+DEFAULT_DB_DIR = "/opt/brain/db"
+
+
+def convert(path: str, fmt: str) -> tuple:
+    """Rewrite the snapshot at ``path`` in ``fmt``, returning both sizes."""
+    storage = JsonFileStorage(path, fmt)
+    with storage.lock:
+        with open(path, "rb") as f:
+            raw = f.read()
+        converted = encode_snapshot(decode_snapshot(raw), fmt)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(converted)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(path)
+    return len(raw), len(converted)
+
+
+def _snapshot_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.json")))
+        else:
+            yield path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert JSONDocumentDB snapshot files")
+    parser.add_argument("--format", choices=FORMATS, required=True,
+                        help="format to write the snapshots in")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DB_DIR],
+                        help="snapshot files or directories holding them")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in _snapshot_paths(args.paths):
+        try:
+            before, after = convert(path, args.format)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        print(f"{path}: {before} -> {after} bytes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from filelock import Timeout
+
+from brain.storage.base import Documents, Entry, Storage
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+LOG = logging.getLogger(__name__)
+
+# Reserved snapshot key holding the sequence number of the last folded log entry
+META_KEY = "__meta__"
+
+# Snapshot formats: indented JSON, JSON without whitespace or msgpack. The
+# format is detected when loading, so a new one is used from the next
+# compaction on
+FORMATS = ("json", "compact", "msgpack")
+SNAPSHOT_FORMAT = os.environ.get("BRAIN_DB_FORMAT", "compact")
+
+
+def encode_snapshot(data: Dict[str, Any], fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(data, indent=2).encode()
+    if fmt == "compact":
+        return json.dumps(data, separators=(",", ":")).encode()
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise ValueError("The msgpack snapshot format requires the msgpack package")
+        return msgpack.packb(data, use_bin_type=True)
+    raise ValueError(f"Unknown snapshot format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+
+def decode_snapshot(raw: bytes) -> Dict[str, Any]:
+    if raw.lstrip()[:1] in (b"{", b""):
+        return json.loads(raw) if raw.strip() else {}
+    if msgpack is None:
+        raise ValueError("Reading a msgpack snapshot requires the msgpack package")
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+def _generation(path: str) -> Optional[tuple]:
+    """Identify a version of a file that is replaced atomically."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _WriteAheadLog:
+    """Append-only log with one JSON entry per line.
+
+    Each entry is written in a single ``write`` so that a crash can only
+    tear the last line.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Inode and number of bytes of the log reflected in memory
+        self.ino = None
+        self.size = 0
+        self.entries = 0
+
+    def read(self, offset: int = 0) -> List[Dict[str, Any]]:
+        """Return the complete entries found after ``offset``."""
+        if not os.path.exists(self.path):
+            self.ino = None
+            self.size = self.entries = 0
+            return []
+        with open(self.path, "rb") as f:
+            return self.read_from(f, offset)
+
+    def read_from(self, f, offset: int) -> List[Dict[str, Any]]:
+        """Return the complete entries of ``f``, the opened log, after ``offset``.
+
+        An incomplete last line is either a write in progress in another
+        process or a torn write left by a crash; it is skipped.
+        """
+        entries = []
+        good = offset
+        self.ino = os.fstat(f.fileno()).st_ino
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                LOG.warning(f"Discarding incomplete entry at the end of {self.path}")
+                break
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Corrupted entry in {self.path} at offset {good}")
+            good += len(line)
+        if offset == 0:
+            self.entries = 0
+        self.size = good
+        self.entries += len(entries)
+        return entries
+
+    def repair(self) -> None:
+        """Truncate what follows the complete entries, the caller holds the file lock."""
+        with open(self.path, "r+b") as f:
+            if os.fstat(f.fileno()).st_ino == self.ino:
+                f.truncate(self.size)
+
+    def unchanged(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return self.ino is None
+        return st.st_ino == self.ino and st.st_size == self.size
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n"
+                       for entry in entries).encode()
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            self.ino = os.fstat(f.fileno()).st_ino
+        self.size += len(data)
+        self.entries += len(entries)
+
+    def drop_prefix(self, offset: int) -> None:
+        """Remove the first ``offset`` bytes, keeping entries appended since."""
+        if not os.path.exists(self.path):
+            self.ino = None
+            self.size = self.entries = 0
+            return
+        with open(self.path, "rb") as f:
+            head = f.read(offset)
+            tail = f.read()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(tail)
+            f.flush()
+            os.fsync(f.fileno())
+            self.ino = os.fstat(f.fileno()).st_ino
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+        # Entries other processes appended after offset are still to be read
+        self.size = max(self.size - offset, 0)
+        self.entries = max(self.entries - head.count(b"\n"), 0)
+
+
+class JsonFileStorage(Storage):
+    """A snapshot file plus an append-only write-ahead log next to it.
+
+    The snapshot is written in ``format``, one of ``FORMATS``, while the log
+    is always one compact JSON entry per line.
+
+    Entries are appended to ``<path>.wal`` and replayed on load. Once the log
+    grows past ``WAL_COMPACT_BYTES`` or ``WAL_COMPACT_ENTRIES`` it is folded
+    into a new snapshot, written to a temporary file and renamed into place.
+    The snapshot records the sequence of the last folded entry so replay
+    stays correct if the process dies between the rename and the log
+    truncation.
+
+    Other processes are noticed by comparing the snapshot generation and the
+    log inode and size with what was read last; usually two ``stat`` calls.
+    Readers never take the file lock.
+    """
+
+    WAL_COMPACT_BYTES = 4 * 1024 * 1024
+    WAL_COMPACT_ENTRIES = 1000
+
+    snapshots = True
+
+    def __init__(self, path: str, fmt: Optional[str] = None) -> None:
+        super().__init__(path)
+        self.format = fmt or SNAPSHOT_FORMAT
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown snapshot format '{self.format}', "
+                             f"expected one of {', '.join(FORMATS)}")
+        self.wal = _WriteAheadLog(f"{path}.wal")
+        self._generation = None
+        # Excludes threads of this process, ``lock`` only excludes processes
+        self._io_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @classmethod
+    def stored_collections(cls, directory: str, suffix: str) -> List[str]:
+        # Until its first compaction a collection only has a log
+        names = set()
+        if os.path.isdir(directory):
+            for entry in os.listdir(directory):
+                for ending in (suffix, f"{suffix}.wal"):
+                    if entry.endswith(ending):
+                        names.add(entry[:-len(ending)])
+        return sorted(names)
+
+    def empty(self) -> bool:
+        return not os.path.exists(self.path) and not os.path.exists(self.wal.path)
+
+    def _open_wal(self):
+        try:
+            return open(self.wal.path, "rb")
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        # Like poll, without waiting for the file lock
+        with self._io_lock:
+            while True:
+                generation = _generation(self.path)
+                data = {}
+                if generation is not None:
+                    try:
+                        with open(self.path, "rb") as f:
+                            data = decode_snapshot(f.read())
+                    except FileNotFoundError:
+                        continue
+                wal = self._open_wal()
+                if _generation(self.path) == generation:
+                    break
+                # Compacted or restored meanwhile
+                if wal is not None:
+                    wal.close()
+
+            self._generation = generation
+            if wal is None:
+                entries = self.wal.read()
+            else:
+                with wal:
+                    entries = self.wal.read_from(wal, 0)
+                    torn = os.fstat(wal.fileno()).st_size != self.wal.size
+                if torn:
+                    self._repair_wal()
+        seq = data.pop(META_KEY, {}).get("seq", 0)
+        return data, seq, entries
+
+    def _repair_wal(self) -> None:
+        # While another process holds the lock the incomplete line is its
+        # write in progress, a torn write once nobody does
+        try:
+            self.lock.acquire(timeout=0)
+        except Timeout:
+            return
+        try:
+            self.wal.repair()
+        finally:
+            self.lock.release()
+
+    def changed(self) -> bool:
+        return _generation(self.path) != self._generation or not self.wal.unchanged()
+
+    def poll(self) -> Optional[List[Entry]]:
+        if not self.changed():
+            return []
+
+        # Readers do not wait for the file lock, held by writers of other
+        # processes until their entries are on disk. The log is appended to or
+        # replaced, never rewritten: its complete lines follow the snapshot
+        # read last, unless the snapshot was replaced by the time it is opened
+        with self._io_lock:
+            wal = self._open_wal()
+            try:
+                if _generation(self.path) != self._generation:
+                    # Compacted or restored by another process
+                    return None
+                if wal is None:
+                    return None if self.wal.ino is not None else []
+                wal_stat = os.fstat(wal.fileno())
+                if ((self.wal.ino is not None and wal_stat.st_ino != self.wal.ino) or
+                        wal_stat.st_size < self.wal.size):
+                    return None
+                return self.wal.read_from(wal, self.wal.size)
+            finally:
+                if wal is not None:
+                    wal.close()
+
+    def append(self, entries: List[Entry]) -> None:
+        with self._io_lock:
+            self.wal.append(entries)
+
+    def import_documents(self, data: Documents, seq: int) -> None:
+        checkpoint = self.checkpoint(seq)
+        self.compact(data, checkpoint)
+
+    def should_compact(self) -> bool:
+        return (self.wal.size >= self.WAL_COMPACT_BYTES or
+                self.wal.entries >= self.WAL_COMPACT_ENTRIES)
+
+    def checkpoint(self, seq: int):
+        with self._io_lock:
+            return (seq, self.wal.size, self._generation, self.wal.ino)
+
+    def _write_snapshot(self, data: Documents, seq: int) -> str:
+        """Write a snapshot to a temporary file and return its path."""
+        data = dict(data)
+        data[META_KEY] = {"seq": seq}
+        raw = encode_snapshot(data, self.format)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def restore(self, data: Documents, seq: int) -> None:
+        tmp_path = self._write_snapshot(data, seq)
+        with self.lock, self._io_lock:
+            os.replace(tmp_path, self.path)
+            _fsync_dir(self.path)
+            # Every entry of the log predates the restored snapshot
+            self.wal.drop_prefix(os.path.getsize(self.wal.path)
+                                 if os.path.exists(self.wal.path) else 0)
+            self._generation = _generation(self.path)
+        LOG.info(f"Restored {self.path} at log sequence {seq}")
+
+    def compact(self, data: Optional[Documents], checkpoint) -> None:
+        seq, offset, generation, wal_ino = checkpoint
+        tmp_path = self._write_snapshot(data, seq)
+
+        with self.lock, self._io_lock:
+            try:
+                current_wal_ino = os.stat(self.wal.path).st_ino
+            except FileNotFoundError:
+                current_wal_ino = None
+            if (_generation(self.path), current_wal_ino) != (generation, wal_ino):
+                LOG.info(f"{self.path} was compacted by another process")
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.path)
+            _fsync_dir(self.path)
+            self.wal.drop_prefix(offset)
+            self._generation = _generation(self.path)
+        LOG.info(f"Compacted {self.path} at log sequence {seq}")
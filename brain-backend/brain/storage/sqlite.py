@@ -0,0 +1,235 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from brain.storage.base import PRIMARY_KEY, Documents, Entry, Storage
+
+LOG = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    id NOT NULL,
+    body TEXT NOT NULL CHECK (json_valid(body)),
+    PRIMARY KEY (collection, id)
+);
+CREATE TABLE IF NOT EXISTS log (
+    seq INTEGER PRIMARY KEY,
+    ops TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class SQLiteStorage(Storage):
+    """Documents stored as JSON rows of a SQLite database in WAL mode.
+
+    Each mutation touches only the rows it changes. The entries are also
+    kept in a ``log`` table, trimmed to the last ``LOG_KEEP_ENTRIES``, from
+    which other processes catch up after ``PRAGMA data_version`` told them
+    something was committed. Readers never take the file lock.
+    """
+
+    LOG_KEEP_ENTRIES = 10000
+    LOG_TRIM_ENTRIES = 1000
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn_lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+        self._seq = 0
+        self._data_version = None
+        self._appended = 0
+
+    @classmethod
+    def stored_collections(cls, directory: str, suffix: str) -> List[str]:
+        # Opening a collection creates its database, it is stored once written
+        names = []
+        if not os.path.isdir(directory):
+            return names
+        for entry in sorted(os.listdir(directory)):
+            if not entry.endswith(suffix):
+                continue
+            conn = sqlite3.connect(os.path.join(directory, entry), timeout=30)
+            try:
+                stored = conn.execute("SELECT 1 FROM meta WHERE key = 'seq'").fetchone()
+            except sqlite3.DatabaseError:
+                stored = None
+            finally:
+                conn.close()
+            if stored:
+                names.append(entry[:-len(suffix)])
+        return names
+
+    def _meta_seq(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+        return row[0] if row else None
+
+    def empty(self) -> bool:
+        with self._conn_lock:
+            return self._meta_seq() is None
+
+    def load(self):
+        with self._conn_lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute(
+                    "SELECT collection, body FROM documents ORDER BY rowid").fetchall()
+                seq = self._meta_seq() or 0
+                self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            finally:
+                self._conn.execute("COMMIT")
+        data: Documents = {}
+        for collection, body in rows:
+            data.setdefault(collection, []).append(json.loads(body))
+        self._seq = seq
+        return data, seq, []
+
+    def changed(self) -> bool:
+        # The connection is busy with a commit of this process, whatever other
+        # processes committed meanwhile is seen by the next call
+        if not self._conn_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version
+        finally:
+            self._conn_lock.release()
+
+    def poll(self) -> Optional[List[Entry]]:
+        with self._conn_lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return []
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute(
+                    "SELECT seq, ops FROM log WHERE seq > ? ORDER BY seq",
+                    (self._seq,)).fetchall()
+                seq = self._meta_seq() or 0
+            finally:
+                self._conn.execute("COMMIT")
+            self._data_version = data_version
+        if seq == self._seq:
+            return []
+        if not rows or rows[0][0] != self._seq + 1 or rows[-1][0] != seq:
+            # The entries were trimmed or the database was restored
+            return None
+        self._seq = seq
+        return [{"seq": row_seq, "ops": json.loads(ops)} for row_seq, ops in rows]
+
+    def _write_op(self, op: Dict[str, Any]) -> None:
+        if op["op"] == "insert":
+            self._conn.execute(
+                "INSERT INTO documents (collection, id, body) VALUES (?, ?, ?)",
+                (op["c"], op["doc"][PRIMARY_KEY], _dumps(op["doc"])))
+        elif op["op"] == "update":
+            row = self._conn.execute(
+                "SELECT body FROM documents WHERE collection = ? AND id = ?",
+                (op["c"], op["id"])).fetchone()
+            if row is None:
+                raise KeyError(op["id"])
+            doc = {**json.loads(row[0]), **op["set"]}
+            self._conn.execute(
+                "UPDATE documents SET id = ?, body = ? WHERE collection = ? AND id = ?",
+                (doc[PRIMARY_KEY], _dumps(doc), op["c"], op["id"]))
+        elif op["op"] == "delete":
+            self._conn.execute("DELETE FROM documents WHERE collection = ? AND id = ?",
+                               (op["c"], op["id"]))
+        else:
+            raise ValueError(f"Unknown log operation '{op['op']}'")
+
+    def append(self, entries: List[Entry]) -> None:
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for entry in entries:
+                    for op in entry["ops"]:
+                        self._write_op(op)
+                    self._conn.execute("INSERT INTO log (seq, ops) VALUES (?, ?)",
+                                       (entry["seq"], _dumps(entry["ops"])))
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seq', ?)",
+                                   (entries[-1]["seq"],))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._seq = entries[-1]["seq"]
+        self._appended += len(entries)
+
+    def import_documents(self, data: Documents, seq: int) -> None:
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO documents (collection, id, body) VALUES (?, ?, ?)",
+                    ((collection, doc[PRIMARY_KEY], _dumps(doc))
+                     for collection, docs in data.items() for doc in docs))
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seq', ?)",
+                                   (seq,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def restore(self, data: Documents, seq: int) -> None:
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM documents")
+                # Without entries to catch up with other processes reload
+                self._conn.execute("DELETE FROM log")
+                self._conn.executemany(
+                    "INSERT INTO documents (collection, id, body) VALUES (?, ?, ?)",
+                    ((collection, doc[PRIMARY_KEY], _dumps(doc))
+                     for collection, docs in data.items() for doc in docs))
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seq', ?)",
+                                   (seq,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._seq = seq
+        self._appended = 0
+        LOG.info(f"Restored {self.path} at log sequence {seq}")
+
+    def create_index(self, collection: str, field: str) -> None:
+        name = re.sub(r"\W", "_", f"ix_{collection}_{field}")
+        path = '$."' + field.replace('"', '') + '"'
+        with self._conn_lock:
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON documents "
+                f"(json_extract(body, {_quote(path)})) WHERE collection = {_quote(collection)}")
+
+    def should_compact(self) -> bool:
+        return self._appended >= self.LOG_TRIM_ENTRIES
+
+    def compact(self, data: Optional[Documents], checkpoint: int) -> None:
+        with self._conn_lock:
+            self._conn.execute("DELETE FROM log WHERE seq <= ?",
+                               (checkpoint - self.LOG_KEEP_ENTRIES,))
+        self._appended = 0
+        LOG.info(f"Trimmed the log of {self.path} up to sequence "
+                 f"{checkpoint - self.LOG_KEEP_ENTRIES}")
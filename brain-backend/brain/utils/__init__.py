@@ -3,4 +3,8 @@
 
 from brain.utils.get_client import get_cephclient # noqa
 from brain.utils.get_client import get_dpuagentclient # noqa
+from brain.utils.get_client import get_async_cephclient # noqa
+from brain.utils.get_client import get_async_dpuagentclient # noqa
+from brain.utils.get_client import client_pool_stats # noqa
+from brain.utils.get_client import circuit_breaker_states # noqa
 from brain.utils.ssh_client import ssh_execute # noqa
\ No newline at end of file
@@ -0,0 +1,331 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""
+Mixins extending the ApiClient of the generated packages. They live out of
+brain/clients, files/codegen.sh replaces those packages on regeneration, and
+only rely on the public methods of the generated ApiClient.
+"""
+
+import datetime
+import functools
+import json
+import re
+from typing import Any
+from urllib.parse import quote
+
+from dateutil.parser import parse
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_MAPPING, SHAPE_SINGLETON
+
+from brain.utils import async_rest
+
+
+class AsyncApiClient:
+    """
+    ApiClient mixin sending the requests on the running event loop. The
+    generated API classes take it in place of an ApiClient, their methods
+    keep their signature and return an awaitable:
+
+        api = VersionApi(client)
+        version = await api.get_version_dpu_agent_v1_version_get()
+
+    Subclasses set exceptions to the exceptions module of their package and
+    api_response to its ApiResponse class. rest_client is the
+    async_rest.RESTClientObject to send the requests with, one of its own by
+    default.
+    """
+
+    def __init__(self, configuration=None, header_name=None, header_value=None,
+                 cookie=None, rest_client=None) -> None:
+        super().__init__(configuration, header_name, header_value, cookie, rest_client=rest_client)
+        if rest_client is None:
+            self.rest_client = async_rest.RESTClientObject(self.configuration, self.exceptions)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        await self.rest_client.close()
+
+    async def call_api(self, resource_path, method,
+                       path_params=None, query_params=None, header_params=None,
+                       body=None, post_params=None, files=None,
+                       response_types_map=None, auth_settings=None,
+                       async_req=None, _return_http_data_only=None,
+                       collection_formats=None, _preload_content=True,
+                       _request_timeout=None, _host=None, _request_auth=None):
+        """
+        Make the HTTP request and return the deserialized data, with the
+        parameters of ApiClient.call_api; async_req is ignored.
+        """
+        method, url, header_params, body, post_params = self.param_serialize(
+            resource_path, method, path_params, query_params, header_params,
+            body, post_params, files, auth_settings, collection_formats,
+            _host, _request_auth)
+        try:
+            response_data = await self.request(
+                method, url,
+                query_params=query_params,
+                headers=header_params,
+                post_params=post_params, body=body,
+                _preload_content=_preload_content,
+                _request_timeout=_request_timeout)
+        except self.exceptions.ApiException as e:
+            if e.body:
+                e.body = e.body.decode("utf-8")
+            raise e
+        return self.response_deserialize(response_data, response_types_map,
+                                         _return_http_data_only, _preload_content)
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        return await self.rest_client.request(method, url,
+                                              query_params=query_params,
+                                              headers=headers,
+                                              post_params=post_params,
+                                              body=body,
+                                              _preload_content=_preload_content,
+                                              _request_timeout=_request_timeout)
+
+    def param_serialize(self, resource_path, method, path_params=None,
+                        query_params=None, header_params=None, body=None,
+                        post_params=None, files=None, auth_settings=None,
+                        collection_formats=None, _host=None, _request_auth=None):
+        """
+        Build the HTTP request of an API call as the generated ApiClient does
+        before sending it, return the method, url, header parameters, body
+        and post parameters to pass to request.
+        """
+        config = self.configuration
+
+        header_params = header_params or {}
+        header_params.update(self.default_headers)
+        if self.cookie:
+            header_params["Cookie"] = self.cookie
+        if header_params:
+            header_params = self.sanitize_for_serialization(header_params)
+            header_params = dict(self.parameters_to_tuples(header_params,
+                                                           collection_formats))
+
+        if path_params:
+            path_params = self.sanitize_for_serialization(path_params)
+            path_params = self.parameters_to_tuples(path_params, collection_formats)
+            for k, v in path_params:
+                # specified safe chars, encode everything
+                resource_path = resource_path.replace(
+                    "{%s}" % k, quote(str(v), safe=config.safe_chars_for_path_param))
+
+        if post_params or files:
+            post_params = post_params if post_params else []
+            post_params = self.sanitize_for_serialization(post_params)
+            post_params = self.parameters_to_tuples(post_params, collection_formats)
+            post_params.extend(self.files_parameters(files))
+
+        self.update_params_for_auth(header_params, query_params, auth_settings,
+                                    resource_path, method, body, request_auth=_request_auth)
+
+        if body:
+            body = self.sanitize_for_serialization(body)
+
+        # server/host defined in path or operation take precedence
+        url = (config.host if _host is None else _host) + resource_path
+        if query_params:
+            query_params = self.sanitize_for_serialization(query_params)
+            url += "?" + self.parameters_to_url_query(query_params, collection_formats)
+
+        return method, url, header_params, body, post_params
+
+    def response_deserialize(self, response_data, response_types_map,
+                             _return_http_data_only=None, _preload_content=True):
+        """
+        Deserialize the response of an API call as the generated ApiClient
+        does, return the data, or an ApiResponse.
+        """
+        self.last_response = response_data
+
+        return_data = None
+        if _preload_content or _return_http_data_only:
+            response_type = response_types_map.get(str(response_data.status), None)
+            if not response_type and 100 <= response_data.status <= 599:
+                # if not found, look for '1XX', '2XX', etc.
+                response_type = response_types_map.get(str(response_data.status)[0] + "XX")
+
+            if response_type != "bytearray":
+                match = None
+                content_type = response_data.getheader("content-type")
+                if content_type is not None:
+                    match = re.search(r"charset=([a-zA-Z\-\d]+)[\s;]?", content_type)
+                encoding = match.group(1) if match else "utf-8"
+                response_data.data = response_data.data.decode(encoding)
+
+            if response_type == "bytearray":
+                return_data = response_data.data
+            elif response_type:
+                return_data = self.deserialize(response_data, response_type)
+
+        if _return_http_data_only:
+            return return_data
+        return self.api_response(status_code=response_data.status,
+                                 data=return_data,
+                                 headers=response_data.getheaders(),
+                                 raw_data=response_data.data)
+
+
+def _trusted_primitive(type_):
+    return type_ in (Any, object, dict, list) or (
+        isinstance(type_, type) and issubclass(type_, (str, int, float, bytes)))
+
+
+def _deserialize_primitive(data, klass):
+    try:
+        return klass(data)
+    except UnicodeEncodeError:
+        return str(data)
+    except TypeError:
+        return data
+
+
+class DeserializingClient:
+    """
+    ApiClient mixin deserializing the responses with a function built once
+    per response type: the type string is parsed and the models it names are
+    looked up only the first time. With trusted_responses, the models are
+    built without validating the data against the API schemas.
+
+    Subclasses set models to the models package of their generated package
+    and exceptions to its exceptions module.
+    """
+    models = None
+    exceptions = None
+    trusted_responses = False
+    # deserializer functions by models package, response type and trusted mode
+    _deserializers = {}
+
+    def deserialize(self, response, response_type):
+        """Deserialize the RESTResponse response into a response_type object."""
+        if response_type == "file":
+            return super().deserialize(response, response_type)
+        try:
+            data = json.loads(response.data)
+        except ValueError:
+            data = response.data
+        return self.deserializer(response_type, self.trusted_responses)(data)
+
+    @classmethod
+    def deserializer(cls, klass, trusted=False):
+        """
+        Return the function deserializing data of type klass, a class or the
+        name of one, building the models without validation when trusted.
+        """
+        key = (cls.models.__name__, klass, trusted)
+        deserialize = cls._deserializers.get(key)
+        if deserialize is None:
+            deserialize = cls._deserializers[key] = cls._build_deserializer(klass, trusted)
+        return deserialize
+
+    @classmethod
+    def _build_deserializer(cls, klass, trusted):
+        if isinstance(klass, str):
+            if klass.startswith("List["):
+                item = cls.deserializer(re.match(r"List\[(.*)]", klass).group(1), trusted)
+                return lambda data: None if data is None else [item(v) for v in data]
+            if klass.startswith("Dict["):
+                value = cls.deserializer(re.match(r"Dict\[([^,]*), (.*)]", klass).group(2),
+                                         trusted)
+                return lambda data: (None if data is None else
+                                     {k: value(v) for k, v in data.items()})
+            if klass in cls.NATIVE_TYPES_MAPPING:
+                klass = cls.NATIVE_TYPES_MAPPING[klass]
+            else:
+                klass = getattr(cls.models, klass)
+
+        if klass in cls.PRIMITIVE_TYPES:
+            deserialize = functools.partial(_deserialize_primitive, klass=klass)
+        elif klass == object:
+            return lambda data: data
+        elif klass == datetime.date:
+            deserialize = functools.partial(cls._deserialize_datetime, kind="date")
+        elif klass == datetime.datetime:
+            deserialize = functools.partial(cls._deserialize_datetime, kind="datetime")
+        elif trusted:
+            deserialize = cls._trusted_model(klass)
+        else:
+            deserialize = klass.from_dict
+        return lambda data: None if data is None else deserialize(data)
+
+    @classmethod
+    def _deserialize_datetime(cls, string, kind):
+        try:
+            value = parse(string)
+        except ValueError:
+            raise cls.exceptions.ApiException(
+                status=0, reason=f"Failed to parse `{string}` as {kind} object")
+        return value.date() if kind == "date" else value
+
+    @classmethod
+    def _trusted_model(cls, klass):
+        """
+        Return the function building klass from a dict without validation.
+        oneOf and anyOf models, and models with a field whose value would need
+        converting, such as a date, keep being built by from_dict.
+        """
+        if "actual_instance" in klass.__fields__:
+            return klass.from_dict  # oneOf or anyOf
+        fields = []
+        try:
+            for name, field in klass.__fields__.items():
+                fields.append((name, field, cls._trusted_field(field)))
+        except TypeError:
+            return klass.from_dict
+
+        def construct(obj):
+            if not isinstance(obj, dict):
+                return klass.from_dict(obj)
+            values = {}
+            for name, field, convert in fields:
+                value = obj.get(field.alias)
+                if value is None:
+                    if field.required:
+                        # Invalid, or with a default from the API schema only
+                        # from_dict knows
+                        return klass.from_dict(obj)
+                    # As from_dict, missing and null fields get their default
+                    value = field.get_default()
+                elif convert is not None:
+                    value = convert(value)
+                values[name] = value
+            return klass.construct(**values)
+        return construct
+
+    @classmethod
+    def _trusted_field(cls, field):
+        """
+        Return the function converting a value of field, None to use it as
+        is. Raise TypeError if the field must be validated.
+        """
+        if field.shape == SHAPE_SINGLETON:
+            if field.sub_fields:
+                # Union, e.g. of StrictFloat and StrictInt
+                for sub_field in field.sub_fields:
+                    if cls._trusted_field(sub_field) is not None:
+                        raise TypeError(field.name)
+                return None
+            if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+                return cls.deserializer(field.type_, True)
+            if _trusted_primitive(field.type_):
+                return None
+            raise TypeError(field.name)
+
+        if field.shape not in (SHAPE_LIST, SHAPE_DICT, SHAPE_MAPPING) or not field.sub_fields:
+            raise TypeError(field.name)
+        item = cls._trusted_field(field.sub_fields[0])
+        if item is None:
+            return None
+        if field.shape == SHAPE_LIST:
+            return lambda value: [item(v) if v is not None else None for v in value]
+        return lambda value: {k: item(v) if v is not None else None for k, v in value.items()}
@@ -0,0 +1,149 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""
+asyncio transport of the generated API clients, based on httpx, with the
+interface of their rest.RESTClientObject. It lives out of the generated
+packages, files/codegen.sh replaces them.
+"""
+
+import io
+import json
+import logging
+import ssl
+
+import httpx
+
+LOG = logging.getLogger(__name__)
+
+
+class RESTResponse(io.IOBase):
+
+    def __init__(self, resp) -> None:
+        self.httpx_response = resp
+        self.status = resp.status_code
+        self.reason = resp.reason_phrase
+        self.data = resp.content
+
+    def getheaders(self):
+        """Returns a dictionary of the response headers."""
+        return self.httpx_response.headers
+
+    def getheader(self, name, default=None):
+        """Returns a given response header."""
+        return self.httpx_response.headers.get(name, default)
+
+
+def new_async_client(configuration, pools_size=4, maxsize=None, timeout=None):
+    """
+    Create the httpx.AsyncClient of a RESTClientObject, with the TLS and
+    proxy settings of configuration, keeping maxsize connections to each of
+    pools_size hosts alive.
+    """
+    if configuration.verify_ssl:
+        verify = ssl.create_default_context(cafile=configuration.ssl_ca_cert)
+        if configuration.cert_file:
+            verify.load_cert_chain(configuration.cert_file, configuration.key_file)
+        if configuration.assert_hostname is False:
+            verify.check_hostname = False
+    else:
+        verify = False
+
+    if maxsize is None:
+        if configuration.connection_pool_maxsize is not None:
+            maxsize = configuration.connection_pool_maxsize
+        else:
+            maxsize = 4
+
+    return httpx.AsyncClient(
+        verify=verify,
+        proxy=configuration.proxy,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=pools_size * maxsize,
+                            max_keepalive_connections=pools_size * maxsize),
+    )
+
+
+class RESTClientObject:
+    """
+    asyncio RESTClientObject raising the exceptions of the generated package
+    whose exceptions module is given.
+    client is the httpx.AsyncClient to send the requests with, so that the
+    clients of many hosts share their connection pool; the RESTClientObject
+    creates and closes its own one by default.
+    """
+
+    def __init__(self, configuration, exceptions, pools_size=4, maxsize=None,
+                 client=None) -> None:
+        self.exceptions = exceptions
+        self.owns_client = client is None
+        if client is None:
+            client = new_async_client(configuration, pools_size, maxsize)
+        self.client = client
+
+    async def close(self):
+        if self.owns_client:
+            await self.client.aclose()
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      body=None, post_params=None, _preload_content=True,
+                      _request_timeout=None):
+        """
+        Perform a request, with the parameters of rest.RESTClientObject.request.
+        The response is always read, _preload_content is ignored.
+        """
+        exceptions = self.exceptions
+        method = method.upper()
+        if method not in ("GET", "HEAD", "DELETE", "POST", "PUT", "PATCH", "OPTIONS"):
+            raise exceptions.ApiValueError(f"Unsupported http method {method}")
+        if post_params and body:
+            raise exceptions.ApiValueError(
+                "body parameter cannot be used with post_params parameter.")
+
+        post_params = post_params or []
+        headers = dict(headers or {})
+
+        kwargs = {}
+        if _request_timeout:
+            if isinstance(_request_timeout, (int, float)):
+                kwargs["timeout"] = httpx.Timeout(_request_timeout)
+            elif isinstance(_request_timeout, tuple) and len(_request_timeout) == 2:
+                kwargs["timeout"] = httpx.Timeout(
+                    None, connect=_request_timeout[0], read=_request_timeout[1])
+
+        if method in ("POST", "PUT", "PATCH", "OPTIONS", "DELETE"):
+            content_type = headers.get("Content-Type")
+            if not content_type or "json" in content_type.lower():
+                if body is not None:
+                    kwargs["content"] = json.dumps(body)
+            elif content_type == "application/x-www-form-urlencoded":
+                kwargs["data"] = dict(post_params)
+            elif content_type == "multipart/form-data":
+                # httpx sets the Content-Type with the boundary of the parts
+                del headers["Content-Type"]
+                kwargs["data"] = {k: v for k, v in post_params if not isinstance(v, tuple)}
+                kwargs["files"] = [(k, v) for k, v in post_params if isinstance(v, tuple)]
+            elif isinstance(body, (str, bytes)):
+                kwargs["content"] = body
+            else:
+                raise exceptions.ApiException(
+                    status=0,
+                    reason="Cannot prepare a request message for provided arguments. "
+                           "Please check that your arguments match declared content type.")
+
+        r = RESTResponse(await self.client.request(method, url, headers=headers, **kwargs))
+        LOG.debug(f"response body: {r.data}")
+
+        if not 200 <= r.status <= 299:
+            if r.status == 400:
+                raise exceptions.BadRequestException(http_resp=r)
+            if r.status == 401:
+                raise exceptions.UnauthorizedException(http_resp=r)
+            if r.status == 403:
+                raise exceptions.ForbiddenException(http_resp=r)
+            if r.status == 404:
+                raise exceptions.NotFoundException(http_resp=r)
+            if 500 <= r.status <= 599:
+                raise exceptions.ServiceException(http_resp=r)
+            raise exceptions.ApiException(http_resp=r)
+        return r
@@ -0,0 +1,148 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import logging
+import os
+import time
+from threading import Lock
+
+import httpx
+import urllib3
+
+from brain.exceptions import HostUnavailable
+
+LOG = logging.getLogger(__name__)
+
+# Consecutive connection failures after which a host is considered down
+BREAKER_FAILURES = int(os.environ.get("BRAIN_BREAKER_FAILURES", 3))
+# Seconds between two attempts to reach a host considered down
+BREAKER_PROBE_INTERVAL = float(os.environ.get("BRAIN_BREAKER_PROBE_INTERVAL", 30))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_connection_failure(error):
+    """Whether error means the host could not be reached, not that it refused a request."""
+    if isinstance(error, (urllib3.exceptions.HTTPError, httpx.TransportError, OSError)):
+        return True
+    # The generated clients turn SSL errors into an ApiException without status
+    return getattr(error, "status", None) == 0
+
+
+class Circuit:
+    """
+    State of one host. Closed, requests go through; open, they fail at once
+    until probe_interval elapsed; half open, a single request probes the host
+    while the others keep failing, and closes or opens the circuit again.
+    """
+
+    def __init__(self, service, host, failures=BREAKER_FAILURES,
+                 probe_interval=BREAKER_PROBE_INTERVAL):
+        self.service = service
+        self.host = host
+        self.failures = failures
+        self.probe_interval = probe_interval
+        self._lock = Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.last_error = None
+        self.rejected = 0
+
+    def _unavailable(self, now):
+        self.rejected += 1
+        retry_after = max(0.0, self.opened + self.probe_interval - now)
+        return HostUnavailable(service=self.service, host=self.host,
+                               reason=self.last_error, retry_after=retry_after)
+
+    def check(self):
+        """Raise HostUnavailable if a request to the host would be rejected."""
+        now = time.time()
+        with self._lock:
+            if self.state == HALF_OPEN or (
+                    self.state == OPEN and now - self.opened < self.probe_interval):
+                raise self._unavailable(now)
+
+    def before(self):
+        """Let a request through, as the probe when one is due, or raise HostUnavailable."""
+        now = time.time()
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and now - self.opened >= self.probe_interval:
+                self.state = HALF_OPEN
+                LOG.info(f"Probing the {self.service} {self.host}")
+                return
+            raise self._unavailable(now)
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                LOG.info(f"The {self.service} {self.host} is reachable again")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def failure(self, error):
+        now = time.time()
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or (
+                    self.state == CLOSED and self.consecutive_failures >= self.failures):
+                if self.state == CLOSED:
+                    LOG.warning(f"The {self.service} {self.host} is unreachable, failing its "
+                                f"requests for {self.probe_interval}s, error: {error}")
+                self.state = OPEN
+                self.opened = now
+
+    def release(self):
+        """End a request that got an answer the breaker does not judge."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state,
+                    "consecutive_failures": self.consecutive_failures,
+                    "opened": self.opened or None,
+                    "last_error": self.last_error,
+                    "rejected": self.rejected}
+
+
+class CircuitBreaker:
+    """Circuits of the hosts of one service."""
+
+    def __init__(self, service, failures=BREAKER_FAILURES, probe_interval=BREAKER_PROBE_INTERVAL):
+        self.service = service
+        self.failures = failures
+        self.probe_interval = probe_interval
+        self._lock = Lock()
+        self._circuits = {}
+
+    def circuit(self, host):
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                circuit = self._circuits[host] = Circuit(self.service, host, self.failures,
+                                                         self.probe_interval)
+            return circuit
+
+    def check(self, host):
+        with self._lock:
+            circuit = self._circuits.get(host)
+        if circuit is not None:
+            circuit.check()
+
+    def states(self):
+        """Return the circuits not closed or with failures, by host."""
+        with self._lock:
+            circuits = list(self._circuits.values())
+        states = {}
+        for circuit in circuits:
+            state = circuit.snapshot()
+            if state["state"] != CLOSED or state["consecutive_failures"] or state["rejected"]:
+                states[circuit.host] = state
+        return states
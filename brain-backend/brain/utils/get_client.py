@@ -1,92 +1,562 @@
 # Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
 # All rights reserved.
 
-from urllib3.util import Retry, Timeout
+import asyncio
+from collections import OrderedDict
+import copy
+import functools
+import os
 import time
 import logging
-from threading import Lock
+from threading import Event, Lock, Thread
+import weakref
 
 from brain.clients.ceph import Configuration as CephConfiguration
 from brain.clients.ceph import ApiClient as CephApiClient
+from brain.clients.ceph import exceptions as ceph_exceptions
+from brain.clients.ceph import models as ceph_models
 from brain.clients.ceph.api import auth_api as cephauth
+from brain.clients.ceph.api_response import ApiResponse as CephApiResponse
+from brain.clients.ceph.exceptions import UnauthorizedException as CephUnauthorized
 from brain.clients.dpuagent import Configuration as DpuConfiguration
 from brain.clients.dpuagent import ApiClient as DpuApiClient
+from brain.clients.dpuagent import exceptions as dpuagent_exceptions
+from brain.clients.dpuagent import models as dpuagent_models
+from brain.clients.dpuagent import rest as dpuagent_rest
 from brain.clients.dpuagent.api import auth_api as dpuagentauth
-
-_ceph_client_pool = {}
-_ceph_client_lock = Lock()
-_dpuagent_client_pool = {}
-_dpuagent_client_lock = Lock()
+from brain.clients.dpuagent.api_response import ApiResponse as DpuApiResponse
+from brain.clients.dpuagent.exceptions import UnauthorizedException as DpuUnauthorized
+from brain.utils import async_rest
+from brain.utils.api_client import AsyncApiClient, DeserializingClient
+from brain.utils.circuit_breaker import CircuitBreaker, is_connection_failure
+from brain.utils.http_pool import dpuagent_async_client, dpuagent_pool_manager, host_pools
 
 TOKEN_EXPIRE_SECONDS = 1800  # 30 minutes
+# Tokens are renewed in the background this long before they expire, for
+# hosts used while the token was valid
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_REFRESH_INTERVAL = 60
+# Clients kept per service, the least recently used ones beyond that and the
+# ones idle for longer than CLIENT_IDLE_SECONDS are closed
+CLIENT_POOL_SIZE = 256
+CLIENT_IDLE_SECONDS = 900
+# Build the models of the responses without validating them against the API
+# schemas, several times faster for large responses
+TRUSTED_RESPONSES = bool(int(os.environ.get("BRAIN_TRUSTED_RESPONSES", 0)))
 LOG = logging.getLogger(__name__)
 
 
-def get_cephclient(mon_host, username="admin", password="yunsilicon"):
+class _ReauthenticatingClient:
     """
-    Return a CephApiClient with valid token.
-    Automatically re-login if token is expired.
+    ApiClient mixin logging in again and retrying once when a request is
+    rejected with 401, e.g. because the token was revoked before it expired.
+    Subclasses set unauthorized to the UnauthorizedException of their package.
+    """
+    # Set by the pool, called with the rejected Authorization header and
+    # returning the new token
+    reauthenticate = None
+
+    def request(self, method, url, query_params=None, headers=None,
+                post_params=None, body=None, _preload_content=True,
+                _request_timeout=None):
+        try:
+            return super().request(method, url, query_params, headers, post_params,
+                                   body, _preload_content, _request_timeout)
+        except self.unauthorized:
+            if self.reauthenticate is None or not headers or "Authorization" not in headers:
+                raise
+            LOG.info(f"Token rejected by {self.configuration.host}, logging in again")
+            token = self.reauthenticate(headers["Authorization"])
+            headers = dict(headers)
+            headers["Authorization"] = f"Bearer {token}"
+            return super().request(method, url, query_params, headers, post_params,
+                                   body, _preload_content, _request_timeout)
+
+
+def _coalesced(method, _preload_content):
+    return method == "GET" and _preload_content
+
+
+def _copy_error(error):
+    try:
+        return copy.copy(error).with_traceback(error.__traceback__)
+    except Exception:
+        return error
+
+
+class _CoalescingClient:
+    """
+    ApiClient mixin making the concurrent GETs of the same URL share a single
+    request. Each caller gets its own copy of the response or of the error,
+    the generated client decodes them in place.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._inflight = {}
+        self._inflight_lock = Lock()
+
+    def request(self, method, url, query_params=None, headers=None,
+                post_params=None, body=None, _preload_content=True,
+                _request_timeout=None):
+        if not _coalesced(method, _preload_content):
+            return super().request(method, url, query_params, headers, post_params,
+                                   body, _preload_content, _request_timeout)
+        with self._inflight_lock:
+            flight = self._inflight.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[url] = _Flight()
+        if leader:
+            try:
+                flight.result = super().request(method, url, query_params, headers,
+                                                post_params, body, _preload_content,
+                                                _request_timeout)
+            except Exception as e:
+                flight.error = e
+            finally:
+                with self._inflight_lock:
+                    del self._inflight[url]
+                flight.done.set()
+        else:
+            LOG.debug(f"Joining the request in progress to {url}")
+            flight.done.wait()
+        if flight.error is not None:
+            raise _copy_error(flight.error)
+        return copy.copy(flight.result)
+
+
+class _AsyncCoalescingClient:
+    """_CoalescingClient of the asyncio clients."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._inflight = {}
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        if not _coalesced(method, _preload_content):
+            return await super().request(method, url, query_params, headers, post_params,
+                                         body, _preload_content, _request_timeout)
+        task = self._inflight.get(url)
+        if task is None:
+            # A task, so that the request survives the cancellation of its first caller
+            task = self._inflight[url] = asyncio.ensure_future(
+                super().request(method, url, query_params, headers, post_params, body,
+                                _preload_content, _request_timeout))
+            task.add_done_callback(functools.partial(self._landed, url))
+        else:
+            LOG.debug(f"Joining the request in progress to {url}")
+        try:
+            return copy.copy(await asyncio.shield(task))
+        except Exception as e:
+            raise _copy_error(e)
+
+    def _landed(self, url, task):
+        del self._inflight[url]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+
+class _AsyncReauthenticatingClient:
+    """_ReauthenticatingClient of the asyncio clients, logging in on a worker thread."""
+    reauthenticate = None
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        try:
+            return await super().request(method, url, query_params, headers, post_params,
+                                         body, _preload_content, _request_timeout)
+        except self.unauthorized:
+            if self.reauthenticate is None or not headers or "Authorization" not in headers:
+                raise
+            LOG.info(f"Token rejected by {self.configuration.host}, logging in again")
+            token = await asyncio.to_thread(self.reauthenticate, headers["Authorization"])
+            headers = dict(headers)
+            headers["Authorization"] = f"Bearer {token}"
+            return await super().request(method, url, query_params, headers, post_params,
+                                         body, _preload_content, _request_timeout)
+
+
+def _record_failure(circuit, error):
+    if is_connection_failure(error):
+        circuit.failure(error)
+    elif getattr(error, "status", None):
+        circuit.success()  # the host answered
+    else:
+        circuit.release()
+
+
+class _BreakingClient:
+    """
+    ApiClient mixin passing each request through the circuit of its host, so
+    that requests to a host known to be down fail at once with HostUnavailable.
+    """
+    # Set by the pool
+    circuit = None
+
+    def request(self, method, url, query_params=None, headers=None,
+                post_params=None, body=None, _preload_content=True,
+                _request_timeout=None):
+        circuit = self.circuit
+        if circuit is None:
+            return super().request(method, url, query_params, headers, post_params,
+                                   body, _preload_content, _request_timeout)
+        circuit.before()
+        try:
+            response = super().request(method, url, query_params, headers, post_params,
+                                       body, _preload_content, _request_timeout)
+        except Exception as e:
+            _record_failure(circuit, e)
+            raise
+        except BaseException:
+            # Not an outcome of the host, a probe must not keep the circuit half open
+            circuit.release()
+            raise
+        circuit.success()
+        return response
+
+
+class _AsyncBreakingClient:
+    """_BreakingClient of the asyncio clients."""
+    circuit = None
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      post_params=None, body=None, _preload_content=True,
+                      _request_timeout=None):
+        circuit = self.circuit
+        if circuit is None:
+            return await super().request(method, url, query_params, headers, post_params,
+                                         body, _preload_content, _request_timeout)
+        circuit.before()
+        try:
+            response = await super().request(method, url, query_params, headers, post_params,
+                                             body, _preload_content, _request_timeout)
+        except Exception as e:
+            _record_failure(circuit, e)
+            raise
+        except BaseException:
+            circuit.release()  # cancelled
+            raise
+        circuit.success()
+        return response
+
+
+class _CephClient(DeserializingClient, CephApiClient):
+    unauthorized = CephUnauthorized
+    exceptions = ceph_exceptions
+    models = ceph_models
+    api_response = CephApiResponse
+    trusted_responses = TRUSTED_RESPONSES
+
+
+class _DpuClient(DeserializingClient, DpuApiClient):
+    unauthorized = DpuUnauthorized
+    exceptions = dpuagent_exceptions
+    models = dpuagent_models
+    api_response = DpuApiResponse
+    trusted_responses = TRUSTED_RESPONSES
+
+
+class _CephApiClient(_CoalescingClient, _ReauthenticatingClient, _BreakingClient, _CephClient):
+    pass
+
+
+class _DpuApiClient(_CoalescingClient, _ReauthenticatingClient, _BreakingClient, _DpuClient):
+    pass
+
+
+class _AsyncCephApiClient(_AsyncCoalescingClient, _AsyncReauthenticatingClient,
+                          _AsyncBreakingClient, AsyncApiClient, _CephClient):
+    pass
+
+
+class _AsyncDpuApiClient(_AsyncCoalescingClient, _AsyncReauthenticatingClient,
+                         _AsyncBreakingClient, AsyncApiClient, _DpuClient):
+    pass
+
+
+class _Flight:
+    """A call in progress, whose outcome every caller for the same key shares."""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _Entry:
+    def __init__(self, client, username, password):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.acquired = 0
+        self.used = 0
+        # asyncio client sharing the configuration, and so the token, of client,
+        # and the event loop it was made for
+        self.async_client = None
+        self.async_loop = None
+
+
+def _close(client):
+    """Close the connections of a client, it reconnects if still used."""
+    pool_manager = client.rest_client.pool_manager
+    try:
+        # The pool manager may be shared with the clients of other hosts
+        for key, _ in host_pools(pool_manager, client.configuration.host):
+            pool_manager.pools.pop(key, None)
+        client.close()
+    except Exception as e:
+        LOG.warning(f"Failed to close the client of {client.configuration.host}, error: {e}")
+
+
+def _open_connections(client):
+    count = 0
+    for _, pool in host_pools(client.rest_client.pool_manager, client.configuration.host):
+        if pool.pool is None:
+            continue
+        idle = list(pool.pool.queue)
+        # Connections out of the queue are in use
+        count += pool.pool.maxsize - len(idle)
+        count += sum(1 for conn in idle if conn is not None and conn.sock is not None)
+    return count
+
+
+class _ClientPool:
     """
-    now = time.time()
-    with _ceph_client_lock:
-        cached = _ceph_client_pool.get(mon_host)
-        if cached:
-            client, acquired_time = cached
-            if now - acquired_time < TOKEN_EXPIRE_SECONDS:
-                return client  # token still valid
+    Logged in clients of one service, keyed by host, at most size of them.
+    A client is kept when its token is renewed, so are its connections.
+    Concurrent callers needing a login for the same host wait for a single one.
+    Hosts found unreachable are rejected at once until breaker probes them.
+    """
+
+    def __init__(self, create, login, breaker, create_async=None, size=CLIENT_POOL_SIZE,
+                 idle=CLIENT_IDLE_SECONDS):
+        self._create = create
+        self._login = login
+        self._create_async = create_async
+        self.breaker = breaker
+        self.size = size
+        self.idle = idle
+        self._lock = Lock()
+        # Least recently used first
+        self._entries = OrderedDict()
+        self._logins = {}
+        self._stats = {"hits": 0, "misses": 0, "logins": 0, "login_failures": 0,
+                       "evictions": 0}
+
+    def _hit(self, host):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry and now - entry.acquired < TOKEN_EXPIRE_SECONDS:
+                entry.used = now
+                self._entries.move_to_end(host)
+                self._stats["hits"] += 1
+                return entry  # token still valid
+            self._stats["misses"] += 1
+        return None
+
+    def get(self, host, username, password):
+        self.breaker.check(host)
+        entry = self._hit(host) or self._authenticate(host, username, password)
+        return entry.client
+
+    async def get_async(self, host, username, password):
+        """
+        Return the asyncio client of host. Only logins, which are rare, run
+        on a worker thread.
+        """
+        self.breaker.check(host)
+        entry = self._hit(host)
+        if entry is None:
+            entry = await asyncio.to_thread(self._authenticate, host, username, password)
+        loop = asyncio.get_running_loop()
+        if entry.async_loop is not loop:
+            entry.async_client = self._create_async(entry.client)
+            entry.async_loop = loop
+        return entry.async_client
+
+    def _authenticate(self, host, username, password, rejected=None):
+        """
+        Log in to host and return its entry, unless another thread is
+        already doing it or did it since the token rejected was used.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(host)
+            if (rejected is not None and entry is not None and
+                    rejected != f"Bearer {entry.client.configuration.access_token}"):
+                return entry
+            # Logged in by a flight that ended since this caller missed the
+            # cache. Tokens due for renewal are not, refresh renews them here.
+            if (rejected is None and entry is not None and
+                    (entry.username, entry.password) == (username, password) and
+                    now - entry.acquired < TOKEN_EXPIRE_SECONDS - TOKEN_REFRESH_MARGIN):
+                return entry
+            flight = self._logins.get(host)
+            leader = flight is None
+            if leader:
+                flight = self._logins[host] = _Flight()
+                if entry is None or (entry.username, entry.password) != (username, password):
+                    entry = None
+
+        if not leader:
+            LOG.debug(f"Waiting for the login to {host} in progress")
+            flight.wait()
+            with self._lock:
+                entry = self._entries.get(host)
+            if entry is None:
+                # Evicted by the logins to other hosts since
+                return self._authenticate(host, username, password, rejected)
+            return entry
+
+        try:
+            if entry is None:
+                client = self._create(host)
+                entry = _Entry(client, username, password)
+                client.reauthenticate = functools.partial(self._reauthenticate, host,
+                                                          username, password)
+                client.circuit = self.breaker.circuit(host)
+            now = time.time()
+            self._login(entry.client, host, username, password)
+            entry.acquired = entry.used = now
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            closing = []
+            with self._lock:
+                self._stats["logins"] += 1
+                if flight.error is None:
+                    replaced = self._entries.get(host)
+                    if replaced is not None and replaced is not entry:
+                        closing.append(replaced.client)
+                    self._entries[host] = entry
+                    self._entries.move_to_end(host)
+                    while len(self._entries) > self.size:
+                        _, evicted = self._entries.popitem(last=False)
+                        closing.append(evicted.client)
+                        self._stats["evictions"] += 1
+                else:
+                    self._stats["login_failures"] += 1
+                del self._logins[host]
+            flight.done.set()
+            for client in closing:
+                _close(client)
+        return entry
+
+    def _reauthenticate(self, host, username, password, rejected):
+        entry = self._authenticate(host, username, password, rejected)
+        return entry.client.configuration.access_token
+
+    def refresh(self):
+        """Renew the tokens about to expire of the hosts still in use."""
+        now = time.time()
+        with self._lock:
+            due = [(host, entry) for host, entry in self._entries.items()
+                   if now - entry.acquired >= TOKEN_EXPIRE_SECONDS - TOKEN_REFRESH_MARGIN and
+                   now - entry.used < TOKEN_EXPIRE_SECONDS]
+        for host, entry in due:
+            try:
+                self._authenticate(host, entry.username, entry.password)
+                LOG.debug(f"Renewed the token of {host}")
+            except Exception as e:
+                LOG.warning(f"Failed to renew the token of {host}, error: {e}")
+
+    def evict_idle(self):
+        """Close the clients not used for the last idle seconds."""
+        now = time.time()
+        with self._lock:
+            idle = [host for host, entry in self._entries.items()
+                    if now - entry.used > self.idle and host not in self._logins]
+            evicted = [self._entries.pop(host) for host in idle]
+            self._stats["evictions"] += len(evicted)
+        for entry in evicted:
+            _close(entry.client)
+        if evicted:
+            LOG.info(f"Closed {len(evicted)} idle clients")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            clients = [entry.client for entry in self._entries.values()]
+        stats["clients"] = len(clients)
+        stats["open_connections"] = sum(_open_connections(client) for client in clients)
+        return stats
+
+
+def _async_client(cls, client, rest_client):
+    """Return an asyncio client sharing the configuration, token and circuit of client."""
+    async_client = cls(client.configuration, rest_client=rest_client)
+    async_client.reauthenticate = client.reauthenticate
+    async_client.circuit = client.circuit
+    return async_client
+
 
-    # Need to login and get a new token
+def _new_cephclient(mon_host):
     ceph_cfg = CephConfiguration(f"https://{mon_host}:8443")
     ceph_cfg.verify_ssl = False
-    apiclient = CephApiClient(ceph_cfg)
+    return _CephApiClient(ceph_cfg)
 
+
+# httpx clients shared by the asyncio Ceph clients, by event loop
+_ceph_async_transports = weakref.WeakKeyDictionary()
+
+
+def _new_async_cephclient(client):
+    loop = asyncio.get_running_loop()
+    transport = _ceph_async_transports.get(loop)
+    if transport is None:
+        transport = _ceph_async_transports[loop] = async_rest.new_async_client(
+            client.configuration, pools_size=CLIENT_POOL_SIZE)
+    rest_client = async_rest.RESTClientObject(client.configuration, ceph_exceptions,
+                                              client=transport)
+    return _async_client(_AsyncCephApiClient, client, rest_client)
+
+
+def _ceph_login(apiclient, mon_host, username, password):
     token_api = cephauth.AuthApi(api_client=apiclient)
     try:
         res = token_api.api_auth_post(
             auth_request={"username": username, "password": password}, _request_timeout=5)
         apiclient.configuration.access_token = res.token
     except Exception as e:
-        LOG.error(f"Failed to log in to the Ceph cluster, error: {e}")
+        LOG.error(f"Failed to log in to the Ceph cluster {mon_host}, error: {e}")
         raise
 
-    # Cache client with timestamp
-    with _ceph_client_lock:
-        _ceph_client_pool[mon_host] = (apiclient, now)
 
-    return apiclient
+class _SharedPoolRESTClient(dpuagent_rest.RESTClientObject):
+    """REST client of the dpuagent sending through a pool manager shared with other clients."""
 
+    def __init__(self, pool_manager):
+        # The generated constructor only builds a pool manager of its own
+        self.pool_manager = pool_manager
 
-def get_dpuagentclient(mv200_server, username="admin", password="yunsilicon"):
-    """
-    Return a DpuagentApiClient with valid token.
-    Automatically re-login if token is expired.
-    """
-    now = time.time()
-    with _dpuagent_client_lock:
-        cached = _dpuagent_client_pool.get(mv200_server)
-        if cached:
-            client, acquired_time = cached
-            if now - acquired_time < TOKEN_EXPIRE_SECONDS:
-                return client  # token still valid
 
-    # Need to login and get a new token
+def _new_dpuagentclient(mv200_server):
     dpuagent_cfg = DpuConfiguration(f"http://{mv200_server}:8000")
     dpuagent_cfg.verify_ssl = False
-    apiclient = DpuApiClient(dpuagent_cfg)
-
-    # --- disable urllib3 retry globally ---
-    if hasattr(apiclient.rest_client, "pool_manager"):
-        pool = apiclient.rest_client.pool_manager
-        if hasattr(pool, "connection_pool_kw"):
-            pool.connection_pool_kw["retries"] = Retry(
-                total=0,       # no retries at all
-                connect=False,
-                read=False,
-                redirect=False,
-                status=False
-            )
-            pool.connection_pool_kw["timeout"] = Timeout(connect=2, read=2)
+    # Warm connections to every SOC, with the timeouts and retries of the
+    # fleet, instead of a pool manager per client
+    return _DpuApiClient(dpuagent_cfg, rest_client=_SharedPoolRESTClient(dpuagent_pool_manager()))
+
+
+def _new_async_dpuagentclient(client):
+    rest_client = async_rest.RESTClientObject(client.configuration, dpuagent_exceptions,
+                                              client=dpuagent_async_client())
+    return _async_client(_AsyncDpuApiClient, client, rest_client)
+
 
+def _dpuagent_login(apiclient, mv200_server, username, password):
     token_api = dpuagentauth.AuthApi(api_client=apiclient)
     try:
         res = token_api.login_for_access_token_token_post(
@@ -96,8 +566,85 @@ def get_dpuagentclient(mv200_server, username="admin", password="yunsilicon"):
         LOG.error(f"Failed to log in to the dpuagent {mv200_server}, error: {e}")
         raise
 
-    # Cache client with timestamp
-    with _dpuagent_client_lock:
-        _dpuagent_client_pool[mv200_server] = (apiclient, now)
 
-    return apiclient
+_ceph_clients = _ClientPool(_new_cephclient, _ceph_login, CircuitBreaker("Ceph cluster"),
+                            _new_async_cephclient)
+_dpuagent_clients = _ClientPool(_new_dpuagentclient, _dpuagent_login,
+                                CircuitBreaker("dpuagent"), _new_async_dpuagentclient)
+
+_maintenance = None
+_maintenance_lock = Lock()
+
+
+def _maintain_pools():
+    while True:
+        time.sleep(TOKEN_REFRESH_INTERVAL)
+        for pool in (_ceph_clients, _dpuagent_clients):
+            try:
+                pool.evict_idle()
+                pool.refresh()
+            except Exception as e:
+                LOG.error(f"Failed to maintain the client pool, error: {e}")
+
+
+def _start_maintenance():
+    global _maintenance
+    if _maintenance is not None:
+        return
+    with _maintenance_lock:
+        if _maintenance is None:
+            _maintenance = Thread(target=_maintain_pools, name="client-pools", daemon=True)
+            _maintenance.start()
+
+
+def get_cephclient(mon_host, username="admin", password="yunsilicon"):
+    """
+    Return a CephApiClient with valid token.
+    Tokens are renewed in the background before they expire, and on 401.
+    """
+    _start_maintenance()
+    return _ceph_clients.get(mon_host, username, password)
+
+
+def get_dpuagentclient(mv200_server, username="admin", password="yunsilicon"):
+    """
+    Return a DpuagentApiClient with valid token.
+    Tokens are renewed in the background before they expire, and on 401.
+    """
+    _start_maintenance()
+    return _dpuagent_clients.get(mv200_server, username, password)
+
+
+async def get_async_cephclient(mon_host, username="admin", password="yunsilicon"):
+    """
+    Return an AsyncApiClient of the Ceph cluster with valid token, whose API
+    methods return awaitables.
+    """
+    _start_maintenance()
+    return await _ceph_clients.get_async(mon_host, username, password)
+
+
+async def get_async_dpuagentclient(mv200_server, username="admin", password="yunsilicon"):
+    """
+    Return an AsyncApiClient of the dpuagent with valid token, whose API
+    methods return awaitables.
+    """
+    _start_maintenance()
+    return await _dpuagent_clients.get_async(mv200_server, username, password)
+
+
+def client_pool_stats():
+    """
+    Return the hits, misses, logins, evictions, clients and open connections
+    of the client pool of each service.
+    """
+    return {"ceph": _ceph_clients.stats(), "dpuagent": _dpuagent_clients.stats()}
+
+
+def circuit_breaker_states():
+    """
+    Return the hosts of each service with an open or half open circuit, or
+    recent connection failures.
+    """
+    return {"ceph": _ceph_clients.breaker.states(),
+            "dpuagent": _dpuagent_clients.breaker.states()}
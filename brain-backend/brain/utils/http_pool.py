@@ -0,0 +1,151 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import asyncio
+import logging
+import os
+import socket
+from threading import Lock
+import weakref
+
+import httpx
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.util import Retry, Timeout
+
+LOG = logging.getLogger(__name__)
+
+# Connection pool shared by the clients of every SOC agent
+DPUAGENT_POOL_HOSTS = int(os.environ.get("BRAIN_DPUAGENT_POOL_HOSTS", 256))
+DPUAGENT_POOL_MAXSIZE = int(os.environ.get("BRAIN_DPUAGENT_POOL_MAXSIZE", 4))
+DPUAGENT_CONNECT_TIMEOUT = float(os.environ.get("BRAIN_DPUAGENT_CONNECT_TIMEOUT", 2))
+# Some agent operations, such as creating a block device, take seconds
+DPUAGENT_READ_TIMEOUT = float(os.environ.get("BRAIN_DPUAGENT_READ_TIMEOUT", 60))
+DPUAGENT_RETRIES = int(os.environ.get("BRAIN_DPUAGENT_RETRIES", 0))
+# TCP keepalive probes of idle connections: first after KEEPALIVE_IDLE seconds,
+# then every KEEPALIVE_INTERVAL seconds, the connection is dropped after
+# KEEPALIVE_COUNT unanswered ones
+KEEPALIVE_IDLE = 60
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+
+class RequestPolicy:
+    """Timeouts and retries of the requests sent through a pool.
+
+    Only connection attempts are retried, a request that reached the agent
+    may not be idempotent.
+    """
+
+    def __init__(self, connect=DPUAGENT_CONNECT_TIMEOUT, read=DPUAGENT_READ_TIMEOUT,
+                 retries=DPUAGENT_RETRIES):
+        self.connect = connect
+        self.read = read
+        self.retries = retries
+
+    @property
+    def timeout(self):
+        return Timeout(connect=self.connect, read=self.read)
+
+    @property
+    def retry(self):
+        return Retry(total=self.retries, connect=self.retries or False,
+                     read=False, redirect=False, status=False)
+
+
+def keepalive_socket_options():
+    """Socket options of urllib3 plus TCP keepalive, where the platform has it."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+                        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+                        ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class PolicyPoolManager(urllib3.PoolManager):
+    """PoolManager applying a RequestPolicy to every request.
+
+    The generated REST clients pass ``timeout=None`` when the caller gave
+    no ``_request_timeout``, which urllib3 takes as no timeout at all; the
+    policy timeout is used instead.
+    """
+
+    def __init__(self, policy, **kwargs):
+        super().__init__(timeout=policy.timeout, retries=policy.retry, **kwargs)
+        self.policy = policy
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        if kw.get("timeout") is None:
+            kw["timeout"] = self.policy.timeout
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+
+def new_pool_manager(hosts=DPUAGENT_POOL_HOSTS, maxsize=DPUAGENT_POOL_MAXSIZE,
+                     policy=None, socket_options=None):
+    """
+    Build a PoolManager keeping maxsize connections to each of up to hosts
+    hosts alive, and applying policy to every request.
+    """
+    return PolicyPoolManager(
+        policy or RequestPolicy(),
+        num_pools=hosts,
+        maxsize=maxsize,
+        socket_options=socket_options or keepalive_socket_options(),
+    )
+
+
+_dpuagent_pool_manager = None
+_dpuagent_pool_manager_lock = Lock()
+
+
+def dpuagent_pool_manager():
+    """Return the PoolManager shared by the dpuagent clients of this process."""
+    global _dpuagent_pool_manager
+    if _dpuagent_pool_manager is None:
+        with _dpuagent_pool_manager_lock:
+            if _dpuagent_pool_manager is None:
+                _dpuagent_pool_manager = new_pool_manager()
+                LOG.info(f"Created the dpuagent connection pool: {DPUAGENT_POOL_HOSTS} hosts, "
+                         f"{DPUAGENT_POOL_MAXSIZE} connections each")
+    return _dpuagent_pool_manager
+
+
+def new_async_client(hosts=DPUAGENT_POOL_HOSTS, maxsize=DPUAGENT_POOL_MAXSIZE, policy=None):
+    """httpx counterpart of new_pool_manager, without limit on the connections per host."""
+    policy = policy or RequestPolicy()
+    transport = httpx.AsyncHTTPTransport(
+        retries=policy.retries,
+        socket_options=keepalive_socket_options(),
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=hosts * maxsize),
+    )
+    return httpx.AsyncClient(transport=transport,
+                             timeout=httpx.Timeout(None, connect=policy.connect, read=policy.read))
+
+
+# httpx clients are bound to the event loop they are used on
+_dpuagent_async_clients = weakref.WeakKeyDictionary()
+
+
+def dpuagent_async_client():
+    """Return the httpx.AsyncClient shared by the dpuagent clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _dpuagent_async_clients.get(loop)
+    if client is None:
+        client = _dpuagent_async_clients[loop] = new_async_client()
+    return client
+
+
+def host_pools(pool_manager, url):
+    """Return the keys and connection pools of pool_manager to the host of url."""
+    url = urllib3.util.parse_url(url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    pools = []
+    for key in pool_manager.pools.keys():
+        if (key.key_scheme, key.key_host, key.key_port) == (url.scheme, url.host, port):
+            pool = pool_manager.pools.get(key)
+            if pool is not None:
+                pools.append((key, pool))
+    return pools
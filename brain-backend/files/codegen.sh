@@ -78,6 +78,14 @@ java -jar ${CODEGEN_CLI_TAR_FILE} generate -i ${CLIENT_OPENAPI_FILE_PATH} -g pyt
 echo "Adding copyright headers"
 find ${CLIENT_SOURCE_DIR} -name \*.py | xargs -i sed -i "1i\# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.\n" {} > /dev/null
 
+echo "Letting the ApiClient take the REST client to send the requests with"
+sed -i -e "s/cookie=None, pool_threads=1) -> None:/cookie=None, pool_threads=1, rest_client=None) -> None:/" \
+    -e "s/self.rest_client = rest.RESTClientObject(configuration)/self.rest_client = rest_client or rest.RESTClientObject(configuration)/" \
+    ${CLIENT_SOURCE_DIR}/api_client.py
+
+echo "Making the package imports lazy"
+python3 ${SCRIPT_DIR}/lazy_init.py ${CLIENT_SOURCE_DIR}
+
 echo "Copying generated code to project"
 rm -rf ${CLIENT_DIR}
 cp -rf ${CLIENT_SOURCE_DIR} ${CLIENT_DIR}
@@ -0,0 +1,100 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+"""Make the package __init__ modules of a generated client import lazily.
+
+Usage: python files/lazy_init.py CLIENT_DIR
+
+The generated __init__ modules of the package, of its api and of its
+models import every API and model, which takes a large part of the
+service startup. Their ``from MODULE import NAME`` lines are turned into
+a map of the names to their modules, imported by a module __getattr__ on
+first use. Run by codegen.sh on every generated client; modules already
+lazy are left alone.
+"""
+
+import os
+import re
+import sys
+
+_IMPORT = re.compile(r"^from (\S+) import (\w+)$")
+
+# Comment of the map of each __init__ module, by path in the package
+COMMENTS = {
+    "__init__.py": (
+        "# The names of the package are imported from their module on first use,\n"
+        "# so that importing the client, or one API of it, does not import every\n"
+        "# API and model of the whole API\n"),
+    os.path.join("api", "__init__.py"): (
+        "# Each API is imported on first use, with the models its operations take\n"
+        "# and return only\n"),
+    os.path.join("models", "__init__.py"): (
+        "# Each model is imported on first use: the API and model modules import\n"
+        "# the models they use from their own module, the deserializers of\n"
+        "# brain.utils.api_client look them up here by name\n"),
+}
+
+_FOOTER = '''
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+'''
+
+
+def make_lazy(source: str, comment: str) -> str:
+    """Return source, a generated __init__ module, importing its names lazily."""
+    lines = source.splitlines()
+    first = next((i for i, line in enumerate(lines) if _IMPORT.match(line)), None)
+    if first is None:
+        raise ValueError("No import to make lazy")
+    # The comment introducing the first import belongs to the map
+    while first > 0 and lines[first - 1].startswith("# import"):
+        first -= 1
+
+    entries = []
+    for line in lines[first:]:
+        match = _IMPORT.match(line)
+        if match:
+            entries.append(f'    "{match.group(2)}": "{match.group(1)}",')
+        elif line.startswith("#"):
+            entries.append(f"    {line}")
+        elif not line.strip():
+            entries.append("")
+        else:
+            raise ValueError(f"Unexpected line in the imports: {line}")
+    while entries and not entries[-1]:
+        entries.pop()
+
+    preamble = "\n".join(lines[:first]).rstrip("\n")
+    return (f"{preamble}\n\nimport importlib\n\n{comment}_LAZY_IMPORTS = {{\n"
+            + "\n".join(entries) + "\n}\n" + _FOOTER)
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print(__doc__.split("\n\n")[1], file=sys.stderr)
+        return 2
+    for path, comment in COMMENTS.items():
+        path = os.path.join(argv[0], path)
+        with open(path) as f:
+            source = f.read()
+        if "_LAZY_IMPORTS" in source:
+            continue
+        with open(path, "w") as f:
+            f.write(make_lazy(source, comment))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,7 +24,7 @@ setuptools.setup(
     license_files=["LICENSE.txt"],
     author="Yunsilicon",
     version=get_version(),
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["tests", "tests.*"]),
     install_requires=load_requirements(),
     include_package_data=True,
 )
@@ -0,0 +1,14 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import pytest
+
+from brain import json_db
+
+
+@pytest.fixture(autouse=True)
+def _restore_db_globals(monkeypatch):
+    """Undo what tests.utils.open_db changes in brain.json_db after each test."""
+    monkeypatch.setattr(json_db, "DB_ENGINE", json_db.DB_ENGINE)
+    monkeypatch.setattr(json_db, "LEGACY_DB_PATHS", json_db.LEGACY_DB_PATHS)
+    monkeypatch.setattr(json_db.JSONDocumentDB, "_instance", json_db.JSONDocumentDB._instance)
@@ -0,0 +1,40 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from brain.json_db import AsyncJSONDocumentDB
+from brain.storage import open_storage
+from tests.utils import open_db
+
+
+@pytest.mark.parametrize("engine,suffix", [("json", ".json"), ("sqlite", ".sqlite3")])
+def test_reads_do_not_wait_for_writers(tmp_path, engine, suffix):
+    db = AsyncJSONDocumentDB(open_db(tmp_path, engine))
+    other_process = open_storage(engine, str(tmp_path / f"disks{suffix}"))
+
+    async def read():
+        return db.find("disks"), db.revision("disks")
+
+    other_process.lock.acquire()
+    try:
+        writer = threading.Thread(target=asyncio.run, args=(db.insert("disks", {"id": "a"}),))
+        writer.start()
+        time.sleep(0.2)
+        # Waiting for the lock of the other process
+        assert writer.is_alive()
+        # A blocked event loop cannot time out, it runs in another thread
+        result = []
+        reader = threading.Thread(target=lambda: result.append(asyncio.run(read())),
+                                  daemon=True)
+        reader.start()
+        reader.join(5)
+        assert result == [([], 0)], "blocked"
+    finally:
+        other_process.lock.release()
+    writer.join()
+    assert [doc["id"] for doc in db.find("disks")] == ["a"]
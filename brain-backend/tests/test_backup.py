@@ -0,0 +1,141 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import io
+import json
+import multiprocessing
+
+import pytest
+
+from brain import backup
+from tests.utils import insert_documents, open_db
+
+ENGINES = ("json", "sqlite")
+
+
+def _backup(db, **kwargs) -> io.BytesIO:
+    return io.BytesIO(b"".join(backup.dump(db, **kwargs)))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_backup_of_collections_written_by_another_process(tmp_path, engine):
+    source = tmp_path / "source"
+    child = multiprocessing.get_context("spawn").Process(
+        target=insert_documents, args=(str(source), engine, "disk", 3))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+
+    db = open_db(source, engine)
+    assert db.collections() == ["disks"]
+    backed_up = _backup(db)
+
+    db = open_db(tmp_path / "target", engine)
+    assert backup.restore(db, backed_up)["disks"]["documents"] == 3
+    assert [doc["id"] for doc in open_db(tmp_path / "target", engine).find("disks")] == [
+        "disk-0", "disk-1", "disk-2"]
+
+
+def _backup_file(data) -> io.BytesIO:
+    header = {"format": backup.BACKUP_FORMAT, "version": backup.BACKUP_VERSION,
+              "collections": {name: {"rev": 1, "documents": len(docs)}
+                              for name, docs in data.items()}}
+    lines = [header] + [{"c": name, "doc": doc} for name, docs in data.items() for doc in docs]
+    return io.BytesIO(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+
+
+@pytest.mark.parametrize("name", ["__meta__", "bad name", "../disks", ""])
+def test_restore_rejects_invalid_collection_names(tmp_path, name):
+    db = open_db(tmp_path, "json")
+    db.insert("disks", {"id": "old"})
+
+    with pytest.raises(ValueError, match="Invalid collection name"):
+        backup.restore(db, _backup_file({"disks": [{"id": "new"}], name: [{"id": "x"}]}))
+    assert [doc["id"] for doc in db.find("disks")] == ["old"]
+
+
+def _populate(db):
+    db.insert_many("disks", [{"id": f"disk-{i}", "size": i, "tags": ["a", "é"]}
+                             for i in range(50)])
+    db.delete_one("disks", {"id": "disk-7"})
+    db.insert("images", {"id": "img", "name": "centos"})
+
+
+def _ids(docs):
+    return [doc["id"] for doc in docs]
+
+
+def _documents(db, name):
+    return [{key: value for key, value in doc.items() if key != "_rev"}
+            for doc in db.find(name)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_backup_round_trip(tmp_path, monkeypatch, engine, compress):
+    # Many chunks
+    monkeypatch.setattr(backup, "CHUNK_SIZE", 256)
+    db = open_db(tmp_path / "source", engine)
+    _populate(db)
+    chunks = list(backup.dump(db, compress=compress))
+    assert len(chunks) > 1
+    assert chunks[0].startswith(b"\x1f\x8b") == compress
+
+    target = open_db(tmp_path / "target", engine)
+    target.insert("disks", {"id": "stale"})
+    target.insert("volumes", {"id": "kept"})
+    results = backup.restore(target, io.BytesIO(b"".join(chunks)))
+    assert {name: result["documents"] for name, result in results.items()} == {
+        "disks": 49, "images": 1}
+
+    for reopened in (target, open_db(tmp_path / "target", engine)):
+        for name in ("disks", "images"):
+            assert _documents(reopened, name) == _documents(db, name)
+            # Changed by the restore
+            assert {doc["_rev"] for doc in reopened.find(name)} == {results[name]["rev"]}
+        assert _ids(reopened.find("volumes")) == ["kept"]
+
+
+def test_backup_of_some_collections(tmp_path):
+    db = open_db(tmp_path, "json")
+    _populate(db)
+    data = backup.read(_backup(db, collections=["images"], compress=True))
+    assert data == {"images": db.find("images")}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_restore_rejects_damaged_backups(tmp_path, compress):
+    db = open_db(tmp_path, "json")
+    _populate(db)
+    raw = _backup(db, compress=compress).getvalue()
+    target = open_db(tmp_path / "target", "json")
+    target.insert("disks", {"id": "old"})
+
+    damaged = [raw[:len(raw) // 2], raw[:-1], raw + b'{"c": "disks"}\n', b"", b"{}\n"]
+    if compress:
+        damaged.append(raw[:20] + bytes(b ^ 0xff for b in raw[20:40]) + raw[40:])
+    else:
+        lines = raw.splitlines(keepends=True)
+        damaged.append(b"".join(lines[:1] + lines[2:]))
+        damaged.append(b"".join(lines[:3] + [b"{not json\n"] + lines[3:]))
+    for data in damaged:
+        with pytest.raises(ValueError):
+            backup.restore(target, io.BytesIO(data))
+    assert _ids(target.find("disks")) == ["old"]
+    assert target.find("images") == []
+
+
+def test_command_line_round_trip(tmp_path, capsys):
+    db = open_db(tmp_path / "source", "json")
+    _populate(db)
+    path = str(tmp_path / "backup.jsonl.gz")
+    assert backup.main(["--db-dir", db.db_dir, "create", "-o", path, "--compress"]) == 0
+
+    target = open_db(tmp_path / "target", "json")
+    assert backup.main(["--db-dir", target.db_dir, "restore", path]) == 0
+    assert "disks: 49 documents" in capsys.readouterr().out
+    assert _documents(target, "disks") == _documents(db, "disks")
+
+    (tmp_path / "empty").write_bytes(b"")
+    assert backup.main(["--db-dir", target.db_dir, "restore", str(tmp_path / "empty")]) == 1
+    assert "Not a backup" in capsys.readouterr().err
@@ -0,0 +1,261 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import threading
+
+import pytest
+
+from brain import json_db
+from tests.utils import open_db
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def engine(request):
+    return request.param
+
+
+@pytest.fixture
+def db(tmp_path, engine):
+    return open_db(tmp_path, engine)
+
+
+def _ids(docs):
+    return [doc["id"] for doc in docs]
+
+
+def test_indexed_queries_keep_the_collection_order(db, tmp_path, engine):
+    db.create_index("disks", "pool")
+    for doc_id in "abc":
+        db.insert("disks", {"id": doc_id, "pool": "rbd"})
+    db.update_one("disks", {"id": "b"}, {"size": 2})
+    db.update_one("disks", {"id": "a"}, {"size": 2})
+    db.update_one("disks", {"id": "c"}, {"id": "c2"})
+
+    expected = ["a", "b", "c2"]
+    assert _ids(db.find("disks", {"pool": "rbd"})) == expected
+    assert _ids(db.find("disks", {"pool": {"$in": ["ssd", "rbd"]}})) == expected
+    assert _ids(db.find("disks", {"id": {"$in": ["c2", "a"]}})) == ["a", "c2"]
+    assert _ids(db.find("disks", {"size": 2})) == ["a", "b"]
+    assert _ids(db.find("disks", {"pool": "rbd"}, limit=2, offset=1)) == ["b", "c2"]
+
+    db = open_db(tmp_path, engine)
+    db.create_index("disks", "pool")
+    assert _ids(db.find("disks", {"pool": "rbd"})) == expected
+
+
+def test_rejected_insert_many_leaves_the_documents_untouched(db):
+    db.insert("disks", {"id": "a"})
+    documents = [{"size": 1}, {"id": "a"}]
+
+    with pytest.raises(ValueError, match="Duplicate id 'a'"):
+        db.insert_many("disks", documents)
+    assert documents == [{"size": 1}, {"id": "a"}]
+    assert db.revision("disks") == 1
+
+    documents = [{"size": 1}, {"id": "b"}]
+    db.insert_many("disks", documents)
+    assert documents[0]["id"] and documents[1] == {"id": "b"}
+    assert _ids(db.find("disks")) == ["a", documents[0]["id"], "b"]
+
+    with pytest.raises(ValueError, match="Duplicate id 'c'"):
+        db.insert_many("disks", [{"id": "c"}, {"id": "c"}])
+    assert db.revision("disks") == 2
+
+
+def test_rejected_update_many_changes_nothing(db):
+    db.insert_many("disks", [{"id": "a", "size": 1}, {"id": "b", "size": 1}])
+
+    with pytest.raises(ValueError, match="with id missing"):
+        db.update_many("disks", {"a": {"size": 2}, "missing": {"size": 2}})
+    assert [doc["size"] for doc in db.find("disks")] == [1, 1]
+
+    assert db.update_many("disks", {"a": {"size": 2}, "b": {"size": 3}}) == 2
+    assert [doc["size"] for doc in db.find("disks")] == [2, 3]
+    assert db.revision("disks") == 2
+
+
+def test_delete_many_ignores_unknown_keys(db, tmp_path, engine):
+    db.insert_many("disks", [{"id": doc_id} for doc_id in "abc"])
+
+    assert db.delete_many("disks", ["a", "missing", "c", "a"]) == 2
+    assert _ids(db.find("disks")) == ["b"]
+    assert db.revision("disks") == 2
+    assert _ids(open_db(tmp_path, engine).find("disks")) == ["b"]
+
+
+@pytest.fixture
+def disks(db):
+    db.insert_many("disks", [
+        {"id": "a", "size": 10, "pool": "rbd"},
+        {"id": "b", "size": 40, "pool": "ssd"},
+        {"id": "c", "size": 20},
+        {"id": "d", "size": "large", "pool": "rbd"},
+    ])
+    return db
+
+
+@pytest.mark.parametrize("filter_dict,expected", [
+    ({"size": {"$eq": 10}}, ["a"]),
+    ({"size": {"$ne": 10}}, ["b", "c", "d"]),
+    ({"pool": {"$in": ["ssd", None]}}, ["b", "c"]),
+    ({"pool": {"$nin": ["rbd"]}}, ["b", "c"]),
+    ({"size": {"$gt": 10}}, ["b", "c"]),
+    ({"size": {"$gte": 20, "$lt": 40}}, ["c"]),
+    ({"size": {"$lte": 20}, "pool": "rbd"}, ["a"]),
+    ({"pool": {"$gt": "a"}}, ["a", "b", "d"]),
+    ({"size": {}}, []),
+])
+def test_query_operators(disks, filter_dict, expected):
+    assert _ids(disks.find("disks", filter_dict)) == expected
+
+
+@pytest.mark.parametrize("filter_dict,error", [
+    ({"size": {"$regex": "a"}}, "Unknown query operator"),
+    ({"size": {"$in": 10}}, "expects a list"),
+])
+def test_invalid_query_operators(disks, filter_dict, error):
+    with pytest.raises(ValueError, match=error):
+        disks.find("disks", filter_dict)
+
+
+def test_sort_projection_and_pages(disks):
+    assert _ids(disks.find("disks", sort="size")) == ["a", "c", "b", "d"]
+    assert _ids(disks.find("disks", sort="-size")) == ["d", "b", "c", "a"]
+    assert _ids(disks.find("disks", sort=[("pool", 1), ("size", -1)])) == ["c", "d", "a", "b"]
+    assert _ids(disks.find("disks", sort="size", limit=2, offset=1)) == ["c", "b"]
+    assert _ids(disks.find("disks", limit=0)) == []
+    assert disks.find("disks", {"id": "a"}, projection=["pool", "missing"]) == [
+        {"id": "a", "pool": "rbd"}]
+
+    with pytest.raises(ValueError, match="must not be negative"):
+        disks.find("disks", offset=-1)
+    with pytest.raises(ValueError, match="must be 1 or -1"):
+        disks.find("disks", sort=[("size", 0)])
+
+
+@pytest.mark.parametrize("filter_dict", [
+    {"pool": "rbd"},
+    {"pool": {"$eq": "ssd"}},
+    {"pool": {"$in": ["ssd", "nvme"]}},
+    {"pool": None},
+    {"pool": "rbd", "size": {"$gt": 10}},
+    {"pool": {"$ne": "rbd"}},
+    {"tags": ["a", "b"]},
+    {"id": "d2", "pool": "rbd"},
+    {"id": {"$in": ["a", "missing"]}},
+    {"id": [1]},
+])
+def test_indexed_queries_match_scans(db, tmp_path, engine, filter_dict):
+    db.create_index("disks", "pool")
+    db.create_index("disks", "tags")
+    db.insert_many("disks", [
+        {"id": "a", "pool": "rbd", "size": 10, "tags": ["a", "b"]},
+        {"id": "b", "pool": "ssd", "size": 20},
+        {"id": "c", "size": 30, "tags": ["a"]},
+        {"id": "d", "pool": "rbd", "size": 40},
+    ])
+    db.update_one("disks", {"id": "b"}, {"pool": "rbd"})
+    db.update_one("disks", {"id": "c"}, {"pool": "ssd", "tags": ["a", "b"]})
+    db.update_one("disks", {"id": "d"}, {"id": "d2"})
+    db.delete_one("disks", {"id": "a"})
+    # Opened without the indexes, and catching up with the commits above
+    scanned = open_db(tmp_path, engine)
+
+    assert db.find("disks", filter_dict) == scanned.find("disks", filter_dict)
+    db.insert("disks", {"id": "e", "pool": "ssd", "tags": ["a", "b"]})
+    assert db.find("disks", filter_dict) == scanned.find("disks", filter_dict)
+
+
+def test_revisions_and_changes(db):
+    assert db.revision("disks") == 0
+    assert db.changes("disks") == {"rev": 0, "reset": False, "documents": [], "deleted": []}
+
+    db.insert_many("disks", [{"id": "a"}, {"id": "b"}, {"id": "c"}])
+    db.update_one("disks", {"id": "a"}, {"size": 1})
+    db.delete_one("disks", {"id": "b"})
+    assert db.revision("disks") == 3
+    assert [doc["_rev"] for doc in db.find("disks")] == [2, 1]
+
+    assert db.changes("disks", since=1) == {
+        "rev": 3, "reset": False, "documents": [{"id": "a", "size": 1, "_rev": 2}],
+        "deleted": ["b"]}
+    assert db.changes("disks", since=2)["documents"] == []
+    assert db.changes("disks", since=3)["deleted"] == []
+    full = db.changes("disks")
+    assert _ids(full["documents"]) == ["c", "a"] and full["deleted"] == ["b"]
+
+    # Deleted then inserted again
+    db.insert("disks", {"id": "b"})
+    changes = db.changes("disks", since=3)
+    assert _ids(changes["documents"]) == ["b"] and changes["deleted"] == []
+
+
+def test_changes_reset_past_the_tombstone_horizon(db, tmp_path, engine, monkeypatch):
+    monkeypatch.setattr(json_db._Collection, "TOMBSTONE_LIMIT", 2)
+    db.insert_many("disks", [{"id": doc_id} for doc_id in "abcd"])
+    for doc_id in "abc":
+        db.delete_one("disks", {"id": doc_id})
+
+    # The deletion of a at revision 2 is forgotten
+    assert db.changes("disks", since=2)["deleted"] == ["b", "c"]
+    for since in (0, 1):
+        changes = db.changes("disks", since=since)
+        assert changes["reset"] and _ids(changes["documents"]) == ["d"]
+
+    # Deletions folded into the stored state are forgotten too
+    db.compact()
+    db = open_db(tmp_path, engine)
+    assert db.revision("disks") == 4
+    assert db.changes("disks", since=3)["reset"]
+    db.delete_one("disks", {"id": "d"})
+    assert db.changes("disks", since=4) == {"rev": 5, "reset": False, "documents": [],
+                                            "deleted": ["d"]}
+
+
+def test_update_one_with_the_expected_version(db):
+    db.insert("disks", {"id": "a", "size": 1})
+    version = db.find_one("disks", {"id": "a"})["_rev"]
+
+    previous = db.update_one("disks", {"id": "a"}, {"size": 2}, expected_version=version)
+    assert previous["size"] == 1
+    # A stale read
+    with pytest.raises(json_db.ConflictError, match=f"at version 2, expected {version}"):
+        db.update_one("disks", {"id": "a"}, {"size": 3}, expected_version=version)
+    assert db.find_one("disks", {"id": "a"}) == {"id": "a", "size": 2, "_rev": 2}
+    assert db.revision("disks") == 2
+
+    db.update_one("disks", {"id": "a"}, {"size": 3}, expected_version=2)
+    # Without expected_version the update is unconditional
+    db.update_one("disks", {"id": "a"}, {"size": 4})
+    assert db.find_one("disks", {"id": "a"})["size"] == 4
+
+
+def test_concurrent_updates_of_the_same_version(db):
+    db.insert("disks", {"id": "a", "count": 0})
+    outcomes = []
+
+    def update(value):
+        try:
+            db.update_one("disks", {"id": "a"}, {"count": value}, expected_version=1)
+            outcomes.append(value)
+        except json_db.ConflictError:
+            outcomes.append(None)
+
+    threads = [threading.Thread(target=update, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    winners = [value for value in outcomes if value is not None]
+    assert len(winners) == 1 and len(outcomes) == 8
+    assert db.find_one("disks", {"id": "a"}) == {"id": "a", "count": winners[0], "_rev": 2}
+
+
+def test_expected_version_sees_the_commits_of_other_processes(db, tmp_path, engine):
+    db.insert("disks", {"id": "a"})
+    db.find("disks")
+    open_db(tmp_path, engine).update_one("disks", {"id": "a"}, {"size": 2})
+
+    with pytest.raises(json_db.ConflictError):
+        db.update_one("disks", {"id": "a"}, {"size": 3}, expected_version=1)
+    db.update_one("disks", {"id": "a"}, {"size": 3}, expected_version=2)
@@ -0,0 +1,195 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from brain.storage.json_file import JsonFileStorage
+from tests.utils import insert_documents, insert_op, log_entry, open_db
+
+
+def _line(entry):
+    return (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+
+
+def _without_waiting(call):
+    """Return what call returns, failing if it blocks."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(call()), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert result, "blocked"
+    return result[0]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "disks.json")
+
+
+@pytest.fixture
+def writer(path):
+    """Storage of another writer, holding the file lock."""
+    storage = JsonFileStorage(path)
+    storage.load()
+    storage.lock.acquire()
+    yield storage
+    storage.lock.release()
+
+
+def test_load_replays_the_log(path):
+    entries = [log_entry(1, insert_op("a", size=1)),
+               log_entry(2, {"op": "update", "c": "disks", "id": "a", "set": {"size": 2}}),
+               log_entry(3, insert_op("b"), {"op": "delete", "c": "disks", "id": "a"})]
+    JsonFileStorage(path).append(entries)
+
+    assert JsonFileStorage(path).load() == ({}, 0, entries)
+
+
+def test_load_replays_only_the_entries_after_the_snapshot(path):
+    storage = JsonFileStorage(path)
+    storage.load()
+    storage.append([log_entry(1, insert_op("a"))])
+    checkpoint = storage.checkpoint(1)
+    storage.append([log_entry(2, insert_op("b"))])
+    storage.compact({"disks": [{"id": "a"}]}, checkpoint)
+
+    data, seq, entries = JsonFileStorage(path).load()
+    assert data == {"disks": [{"id": "a"}]}
+    assert seq == 1
+    assert entries == [log_entry(2, insert_op("b"))]
+
+
+def test_load_repairs_a_torn_last_line(path):
+    entries = [log_entry(1, insert_op("a")), log_entry(2, insert_op("b"))]
+    JsonFileStorage(path).append(entries)
+    size = os.path.getsize(f"{path}.wal")
+    with open(f"{path}.wal", "ab") as f:
+        f.write(_line(log_entry(3, insert_op("c")))[:10])
+
+    storage = JsonFileStorage(path)
+    assert storage.load() == ({}, 0, entries)
+    assert os.path.getsize(f"{path}.wal") == size
+
+    storage.append([log_entry(3, insert_op("d"))])
+    assert JsonFileStorage(path).load()[2] == entries + [log_entry(3, insert_op("d"))]
+
+
+def test_load_rejects_a_corrupted_entry(path):
+    with open(f"{path}.wal", "wb") as f:
+        f.write(b"{\"seq\":1,\n" + _line(log_entry(2, insert_op("a"))))
+
+    with pytest.raises(ValueError, match="Corrupted entry"):
+        JsonFileStorage(path).load()
+
+
+def test_poll_waits_for_a_line_being_written(path):
+    reader = JsonFileStorage(path)
+    reader.load()
+    line = _line(log_entry(1, insert_op("a")))
+    with open(f"{path}.wal", "ab") as f:
+        f.write(line[:10])
+        f.flush()
+        assert reader.poll() == []
+        f.write(line[10:])
+
+    assert reader.poll() == [log_entry(1, insert_op("a"))]
+    assert reader.poll() == []
+
+
+def test_poll_asks_for_a_reload_after_a_compaction(path):
+    reader = JsonFileStorage(path)
+    reader.load()
+    writer = JsonFileStorage(path)
+    writer.load()
+    writer.append([log_entry(1, insert_op("a"))])
+    writer.compact({"disks": [{"id": "a"}]}, writer.checkpoint(1))
+
+    assert reader.poll() is None
+
+
+def test_poll_does_not_wait_for_a_writer(path, writer):
+    reader = JsonFileStorage(path)
+    reader.load()
+    writer.append([log_entry(1, insert_op("a"))])
+
+    assert _without_waiting(reader.poll) == [log_entry(1, insert_op("a"))]
+
+
+def test_load_does_not_wait_for_a_writer(path, writer):
+    reader = JsonFileStorage(path)
+    reader.load()
+    writer.append([log_entry(1, insert_op("a"))])
+    writer.compact({"disks": [{"id": "a"}]}, writer.checkpoint(1))
+    writer.append([log_entry(2, insert_op("b"))])
+    line = _line(log_entry(3, insert_op("c")))
+    with open(f"{path}.wal", "ab") as f:
+        f.write(line[:10])
+
+    assert _without_waiting(reader.poll) is None
+    assert _without_waiting(reader.load) == (
+        {"disks": [{"id": "a"}]}, 1, [log_entry(2, insert_op("b"))])
+    # The incomplete line is the write in progress of the lock holder
+    with open(f"{path}.wal", "ab") as f:
+        f.write(line[10:])
+    assert reader.poll() == [log_entry(3, insert_op("c"))]
+
+
+def test_database_reads_do_not_wait_for_a_writer(tmp_path):
+    db = open_db(tmp_path, "json")
+    db.insert("disks", {"id": "a"})
+    writer = JsonFileStorage(str(tmp_path / "disks.json"))
+    writer.load()
+    with writer.lock:
+        writer.append([log_entry(2, insert_op("b"))])
+        docs = _without_waiting(lambda: db.find("disks"))
+    assert [doc["id"] for doc in docs] == ["a", "b"]
+
+
+def test_database_replays_its_log_after_a_restart(tmp_path):
+    db = open_db(tmp_path, "json")
+    for i in range(5):
+        db.insert("disks", {"id": str(i), "pool": "rbd"})
+    db.update_one("disks", {"id": "1"}, {"pool": "ssd"})
+    db.delete_one("disks", {"id": "3"})
+    expected = db.find("disks")
+
+    assert open_db(tmp_path, "json").find("disks") == expected
+
+
+def test_database_survives_a_torn_last_line(tmp_path):
+    db = open_db(tmp_path, "json")
+    db.insert("disks", {"id": "a"})
+    with open(tmp_path / "disks.json.wal", "ab") as f:
+        f.write(b'{"seq":2,"ops":[{"op":"insert"')
+
+    db = open_db(tmp_path, "json")
+    assert [doc["id"] for doc in db.find("disks")] == ["a"]
+    db.insert("disks", {"id": "b"})
+    assert [doc["id"] for doc in open_db(tmp_path, "json").find("disks")] == ["a", "b"]
+
+
+def test_compaction_keeps_the_entries_of_another_process(tmp_path):
+    db = open_db(tmp_path, "json")
+    db.insert("disks", {"id": "parent-0"})
+    child = multiprocessing.get_context("spawn").Process(
+        target=insert_documents, args=(str(tmp_path), "json", "child", 300))
+    child.start()
+    inserted = 1
+    while child.is_alive():
+        db.insert("disks", {"id": f"parent-{inserted}"})
+        inserted += 1
+        db.compact()
+    child.join()
+    assert child.exitcode == 0
+
+    expected = ({f"child-{i}" for i in range(300)} |
+                {f"parent-{i}" for i in range(inserted)})
+    for docs in (db.find("disks"), open_db(tmp_path, "json").find("disks")):
+        assert {doc["id"] for doc in docs} == expected
+        # Every insert was its own commit in a single sequence
+        assert len({doc["_rev"] for doc in docs}) == len(expected)
@@ -0,0 +1,136 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+import multiprocessing
+
+import pytest
+
+from brain.storage.sqlite import SQLiteStorage
+from tests.utils import insert_documents, insert_op, log_entry, open_db
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "disks.sqlite3")
+
+
+def test_load_returns_the_documents_written(path):
+    storage = SQLiteStorage(path)
+    assert storage.empty()
+    storage.append([log_entry(1, insert_op("a", size=1), insert_op("b")),
+                    log_entry(2, {"op": "update", "c": "disks", "id": "a", "set": {"size": 2}}),
+                    log_entry(3, {"op": "delete", "c": "disks", "id": "b"})])
+
+    reopened = SQLiteStorage(path)
+    assert not reopened.empty()
+    assert reopened.load() == ({"disks": [{"id": "a", "size": 2}]}, 3, [])
+
+
+def test_failed_append_writes_nothing(path):
+    storage = SQLiteStorage(path)
+    storage.append([log_entry(1, insert_op("a"))])
+
+    with pytest.raises(KeyError):
+        storage.append([log_entry(2, insert_op("b")),
+                        log_entry(3, {"op": "update", "c": "disks", "id": "x", "set": {}})])
+    assert SQLiteStorage(path).load() == ({"disks": [{"id": "a"}]}, 1, [])
+
+
+def test_poll_returns_the_entries_of_other_connections(path):
+    reader = SQLiteStorage(path)
+    reader.load()
+    assert not reader.changed()
+    assert reader.poll() == []
+
+    entries = [log_entry(1, insert_op("a")), log_entry(2, insert_op("b"))]
+    SQLiteStorage(path).append(entries)
+    assert reader.changed()
+    assert reader.poll() == entries
+    assert reader.poll() == []
+
+
+def test_poll_asks_for_a_reload_after_a_restore(path):
+    reader = SQLiteStorage(path)
+    reader.load()
+    writer = SQLiteStorage(path)
+    writer.append([log_entry(1, insert_op("a"))])
+    writer.restore({"disks": [{"id": "b"}]}, 5)
+
+    assert reader.poll() is None
+    assert reader.load() == ({"disks": [{"id": "b"}]}, 5, [])
+
+
+def test_poll_asks_for_a_reload_once_its_entries_are_trimmed(path):
+    reader = SQLiteStorage(path)
+    reader.load()
+    writer = SQLiteStorage(path)
+    writer.LOG_KEEP_ENTRIES = 2
+    writer.append([log_entry(seq, insert_op(str(seq))) for seq in range(1, 6)])
+    writer.compact(None, 5)
+
+    assert reader.poll() is None
+    current = SQLiteStorage(path)
+    current.load()
+    writer.append([log_entry(6, insert_op("6"))])
+    assert current.poll() == [log_entry(6, insert_op("6"))]
+
+
+def test_compaction_is_due_after_log_trim_entries(path):
+    storage = SQLiteStorage(path)
+    storage.LOG_TRIM_ENTRIES = 3
+    storage.append([log_entry(1, insert_op("a")), log_entry(2, insert_op("b"))])
+    assert not storage.should_compact()
+    storage.append([log_entry(3, insert_op("c"))])
+    assert storage.should_compact()
+    storage.compact(None, 3)
+    assert not storage.should_compact()
+
+
+def test_import_documents_fills_an_empty_storage(path):
+    storage = SQLiteStorage(path)
+    storage.import_documents({"disks": [{"id": "a"}, {"id": "b"}]}, 7)
+
+    assert SQLiteStorage(path).load() == ({"disks": [{"id": "a"}, {"id": "b"}]}, 7, [])
+
+
+def test_indexes_are_used_by_queries(path):
+    storage = SQLiteStorage(path)
+    storage.create_index("disks", "pool")
+
+    plan = storage._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT body FROM documents "
+        "WHERE collection = 'disks' AND json_extract(body, '$.\"pool\"') = 'rbd'").fetchall()
+    assert "ix_disks_pool" in " ".join(row[-1] for row in plan)
+
+
+def test_database_state_survives_a_restart(tmp_path):
+    db = open_db(tmp_path, "sqlite")
+    db.create_index("disks", "pool")
+    for i in range(5):
+        db.insert("disks", {"id": str(i), "pool": "rbd"})
+    db.update_one("disks", {"id": "1"}, {"pool": "ssd"})
+    db.delete_one("disks", {"id": "3"})
+    expected = db.find("disks")
+
+    db = open_db(tmp_path, "sqlite")
+    assert db.find("disks") == expected
+    assert [doc["id"] for doc in db.find("disks", {"pool": "ssd"})] == ["1"]
+
+
+def test_writers_in_two_processes(tmp_path):
+    db = open_db(tmp_path, "sqlite")
+    child = multiprocessing.get_context("spawn").Process(
+        target=insert_documents, args=(str(tmp_path), "sqlite", "child", 200))
+    child.start()
+    inserted = 0
+    while child.is_alive():
+        db.insert("disks", {"id": f"parent-{inserted}"})
+        inserted += 1
+    child.join()
+    assert child.exitcode == 0
+
+    expected = ({f"child-{i}" for i in range(200)} |
+                {f"parent-{i}" for i in range(inserted)})
+    for docs in (db.find("disks"), open_db(tmp_path, "sqlite").find("disks")):
+        assert {doc["id"] for doc in docs} == expected
+        assert len({doc["_rev"] for doc in docs}) == len(expected)
@@ -0,0 +1,33 @@
+# Copyright (C) 2021 - 2025, Shanghai Yunsilicon Technology Co., Ltd.
+# All rights reserved.
+
+from brain import json_db
+
+
+def open_db(path, engine: str) -> json_db.JSONDocumentDB:
+    """Open a private database in ``path``, bypassing the process singleton."""
+    json_db.DB_ENGINE = engine
+    json_db.LEGACY_DB_PATHS = []
+    json_db.JSONDocumentDB._instance = None
+    db = json_db.JSONDocumentDB()
+    db.db_dir = str(path)
+    return db
+
+
+def insert_op(doc_id, **fields):
+    """Return the log operation inserting document ``doc_id`` into "disks"."""
+    return {"op": "insert", "c": "disks", "doc": {"id": doc_id, **fields}}
+
+
+def log_entry(seq, *ops):
+    return {"seq": seq, "ops": list(ops)}
+
+
+def insert_documents(path, engine: str, prefix: str, count: int) -> None:
+    """Insert ``count`` documents into "disks", one commit each.
+
+    Run in another process by the tests of concurrent writers.
+    """
+    db = open_db(path, engine)
+    for i in range(count):
+        db.insert("disks", {"id": f"{prefix}-{i}"})